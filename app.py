@@ -1,48 +1,224 @@
+import os
+
+import altair as alt
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
+
+import charts
+import columnar_source as cs
+import dashboard_common as common
+import data_layer as dl
+import downsampling
+import instrumentation as instr
+import kpi_analytics
+
+# Живой поток и DuckDB нужны не на каждой отрисовке — подключаются при первом обращении (common.lazy)
+live_feed = common.lazy("live_feed")
+query_engine = common.lazy("query_engine")
+
+KPI_COLUMNS = ["date", "precision", "recall", "latency_ms", "ci_cd_success_rate", "uptime", "nps"]
+# Live-режим для стенового экрана: интервал опроса (с) и ёмкость кольцевого буфера (точек)
+LIVE_INTERVAL = int(os.environ.get("DASHBOARD_LIVE_INTERVAL", 5))
+LIVE_CAPACITY = int(os.environ.get("DASHBOARD_LIVE_CAPACITY", 2_000))
+# Точек-аномалий на графике не больше этого числа (последние по времени)
+MAX_ANOMALIES = int(os.environ.get("DASHBOARD_MAX_ANOMALIES", 500))
+LIVE_CHARTS = {"latency_ms": "⚡ Latency (ms)", "uptime": "☁️ Uptime", "ci_cd_success_rate": "🚀 CI/CD Success Rate"}
 
 st.set_page_config(page_title="AI KPI Dashboard", layout="wide")
 
 st.title("🤖 AI Team KPI Dashboard")
 st.subheader("📊 Мок-данные по команде NLP / MLOps / DevOps")
 
-# Фейковые данные
-dates = pd.date_range(start="2025-06-01", periods=30, freq="D")
-data = pd.DataFrame({
-    "date": dates,
-    "precision": np.random.uniform(0.8, 0.97, size=30),
-    "recall": np.random.uniform(0.75, 0.95, size=30),
-    "latency_ms": np.random.randint(200, 800, size=30),
-    "ci_cd_success_rate": np.random.uniform(0.8, 1.0, size=30),
-    "uptime": np.random.uniform(99.5, 100.0, size=30),
-    "nps": np.random.uniform(30, 90, size=30),
-})
+# Фейковые данные (если колоночное хранилище не подключено). Генератор посеян:
+# окно страницы, агрегаты query_engine и живой поток видят один и тот же ряд
+MOCK_SEED = 2025
+
+
+def mock_kpi_daily():
+    rng = np.random.default_rng(MOCK_SEED)
+    dates = pd.date_range(start="2025-06-01", periods=30, freq="D")
+    return pd.DataFrame({
+        "date": dates,
+        "precision": rng.uniform(0.8, 0.97, size=30),
+        "recall": rng.uniform(0.75, 0.95, size=30),
+        "latency_ms": rng.integers(200, 800, size=30),
+        "ci_cd_success_rate": rng.uniform(0.8, 1.0, size=30),
+        "uptime": rng.uniform(99.5, 100.0, size=30),
+        "nps": rng.uniform(30, 90, size=30),
+    })
+
+
+# Из хранилища читаются только колонки, которые рисует страница, и только видимое окно дат.
+# Кадр общий для всех сессий (типы — по schema_registry), на месте не изменяется
+@st.cache_resource(ttl=600, max_entries=64, show_spinner=False)
+def load_window(date_from, date_to, version):
+    data = cs.load("kpi_daily", mock_kpi_daily, columns=KPI_COLUMNS, date_from=date_from, date_to=date_to)
+    # Источники пишут разные метрики отдельными строками — склеиваем по дате
+    return data.groupby("date", as_index=False, sort=True).first()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_bounds(version):
+    return cs.date_bounds("kpi_daily", mock_kpi_daily)
+
+
+# Прорежённый ряд под ширину графика; при сужении окна точки берутся детальнее
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def chart_data(date_from, date_to, columns, method, version, width_px=downsampling.DEFAULT_WIDTH_PX):
+    return downsampling.downsample(load_window(date_from, date_to, version), "date", list(columns), width_px, method)
+
+
+# Базовая линия (kpi_analytics.rolling) считается по полному окну до прореживания —
+# прореживание не сглаживает выбросы. В браузер уходят прорежённые ряд, EWMA и полоса
+# P5–P95 и отдельно только точки-аномалии
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
+def baseline_data(date_from, date_to, column, method, version, width_px=downsampling.DEFAULT_WIDTH_PX):
+    data = kpi_analytics.rolling(load_window(date_from, date_to, version)[["date", column]].dropna(), column)
+    low, high, ewma, flag = (kpi_analytics.column_name(column, suffix) for suffix in
+                             (kpi_analytics.LOW, kpi_analytics.HIGH, kpi_analytics.EWMA, kpi_analytics.ANOMALY))
+    line = downsampling.downsample(data, "date", [column, ewma, low, high], width_px, method)
+    anomalies = data.loc[data[flag], ["date", column]]
+    return line, anomalies.tail(MAX_ANOMALIES).reset_index(drop=True), len(anomalies)
+
+
+def kpi_chart(column, date_from, date_to, method, baseline, version):
+    if not baseline:
+        st.line_chart(chart_data(date_from, date_to, (column,), method, version), x="date", y=column)
+        return
+    line, anomalies, total = baseline_data(date_from, date_to, column, method, version)
+    st.altair_chart(charts.baseline_chart(line, alt.X("date:T", title=None), column, "#007BFF", anomalies,
+                                          title=column, scale=alt.Scale(zero=False)),
+                    use_container_width=True)
+    st.caption(f"Аномалий (|z| > {kpi_analytics.Z_THRESHOLD:g}): {total}"
+               + (f" · на графике последние {len(anomalies)}" if total > len(anomalies) else ""))
+
+
+cs.register_fallback("kpi_daily", mock_kpi_daily)
+
+GRAINS = {"day": "День", "week": "Неделя", "month": "Месяц", "quarter": "Квартал", "year": "Год"}
+AGGREGATES = {"avg": "Среднее", "median": "Медиана", "min": "Минимум", "max": "Максимум", "p95": "95-й перцентиль"}
+THRESHOLDS = {None: "—", "<": "ниже порога", ">": "выше порога"}
+
+
+# Срез по шагу дат и порогу метрики считает DuckDB (query_engine) — по всем потокам
+# и без загрузки ряда в pandas; Arrow-таблица из кэша движка сразу идёт в график
+def kpi_cut(metric, grain, aggregate, condition, threshold, date_from, date_to, version):
+    filters = [("date", ">=", date_from), ("date", "<=", date_to)]
+    if condition is not None:
+        filters.append((metric, condition, threshold))
+    return query_engine.aggregate(
+        "kpi_daily",
+        {metric: (aggregate, metric), "Дней": ("count", metric)},
+        grain=("date", grain),
+        filters=filters,
+        version=version,
+    )
+
+
+# Буфер один на процесс: все открытые экраны читают одно окно, опрос источника — один.
+# Без хранилища симуляция продолжает мок-ряд страницы с тем же seed
+@st.cache_resource(show_spinner=False)
+def get_live_feed(capacity):
+    if cs.has_dataset("kpi_daily"):
+        return live_feed.LiveFeed(list(LIVE_CHARTS), capacity)
+    return live_feed.LiveFeed(list(LIVE_CHARTS), capacity, seed=MOCK_SEED, history=mock_kpi_daily())
+
+
+# Перерисовывается только этот фрагмент; в браузер уходит окно буфера, прорежённое под
+# ширину графика, — объём не зависит от того, сколько часов открыт экран
+def live_charts(interval, method, baseline):
+    feed = get_live_feed(LIVE_CAPACITY)
+    feed.poll(interval, dl.get_source_version())
+    window = feed.buffer.frame()
+    for column, container in zip(LIVE_CHARTS, st.columns(len(LIVE_CHARTS))):
+        container.markdown(f"#### {LIVE_CHARTS[column]}")
+        if not baseline:
+            container.line_chart(downsampling.downsample(window, "date", [column], method=method), x="date", y=column)
+            continue
+        low, high, ewma, flag = (kpi_analytics.column_name(column, suffix) for suffix in
+                                 (kpi_analytics.LOW, kpi_analytics.HIGH, kpi_analytics.EWMA, kpi_analytics.ANOMALY))
+        # EWMA и флаги аномалий посчитаны инкрементально при опросе и лежат в буфере;
+        # полоса P5–P95 — по окну буфера при отрисовке
+        lows, highs = kpi_analytics.band(window[column])
+        line = downsampling.downsample(window.assign(**{low: lows, high: highs}), "date", [column, ewma, low, high],
+                                       method=method)
+        anomalies = window.loc[window[flag] > 0, ["date", column]].tail(MAX_ANOMALIES)
+        container.altair_chart(charts.baseline_chart(line, alt.X("date:T", title=None), column, "#007BFF", anomalies,
+                                                     title=column, scale=alt.Scale(zero=False)),
+                               use_container_width=True)
+    st.caption(f"Точек в окне: {len(feed.buffer)} из {feed.buffer.capacity} · получено всего: {feed.buffer.total}"
+               f" · обновление каждые {interval} с")
+
+
+# Версия данных меняется только когда сборщик (ingestion.py) записал новую пачку
+version = dl.get_source_version()
+
+# Видимый диапазон и способ прореживания
+date_min, date_max = load_bounds(version)
+window = st.sidebar.date_input("Период", (date_min.date(), date_max.date()),
+                               min_value=date_min.date(), max_value=date_max.date())
+if len(window) != 2:
+    window = (date_min.date(), date_max.date())
+date_from = pd.Timestamp(window[0])
+date_to = pd.Timestamp(window[1]) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+method = st.sidebar.selectbox("Прореживание", list(downsampling.METHODS), format_func=downsampling.METHODS.get)
+baseline = st.sidebar.toggle("Базовая линия и аномалии", value=True, key="baseline")
+live = st.sidebar.toggle("Live-режим", key="live")
+live_interval = st.sidebar.number_input("Обновление, с", min_value=1, value=LIVE_INTERVAL, step=1, disabled=not live,
+                                        key="live_interval")
+
+if live:
+    st.markdown("### 🔴 Live")
+    st.fragment(run_every=live_interval)(live_charts)(live_interval, method, baseline)
 
 # KPI-графики
 col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### 📌 Precision & Recall (NLP)")
-    chart = alt.Chart(data).transform_fold(
-        ['precision', 'recall']
+    chart = charts.fold_chart(
+        chart_data(date_from, date_to, ("precision", "recall"), method, version), "date", ['precision', 'recall']
     ).mark_line().encode(
         x='date:T',
         y='value:Q',
         color='key:N'
     )
+    if baseline:
+        # Аномалии precision/recall — точками поверх обеих линий
+        anomalies = pd.concat([
+            baseline_data(date_from, date_to, key, method, version)[1].rename(columns={key: "value"}).assign(key=key)
+            for key in ("precision", "recall")
+        ], ignore_index=True)
+        chart = chart + alt.Chart(anomalies).mark_point(color="#DC143C", filled=True, size=80).encode(
+            x='date:T',
+            y='value:Q',
+            tooltip=['date', 'key', 'value']
+        )
     st.altair_chart(chart, use_container_width=True)
 
 with col2:
     st.markdown("### ⚡ Latency (ms)")
-    st.line_chart(data.set_index("date")["latency_ms"])
+    kpi_chart("latency_ms", date_from, date_to, method, baseline, version)
 
 st.markdown("### 🚀 CI/CD Success Rate")
-st.line_chart(data.set_index("date")["ci_cd_success_rate"])
+kpi_chart("ci_cd_success_rate", date_from, date_to, method, baseline, version)
 
 st.markdown("### ☁️ Uptime")
-st.line_chart(data.set_index("date")["uptime"])
+kpi_chart("uptime", date_from, date_to, method, baseline, version)
 
 st.markdown("### ❤️‍🔥 NPS пользователей")
-st.line_chart(data.set_index("date")["nps"])
+kpi_chart("nps", date_from, date_to, method, baseline, version)
+
+st.markdown("### 🔎 Срез KPI")
+col_metric, col_grain, col_agg, col_condition, col_threshold = st.columns(5)
+cut_metric = col_metric.selectbox("Метрика", KPI_COLUMNS[1:], key="cut_metric")
+cut_grain = col_grain.selectbox("Шаг", list(GRAINS), index=2, format_func=GRAINS.get, key="cut_grain")
+cut_aggregate = col_agg.selectbox("Агрегат", list(AGGREGATES), format_func=AGGREGATES.get, key="cut_aggregate")
+cut_condition = col_condition.selectbox("Отбор", list(THRESHOLDS), format_func=THRESHOLDS.get, key="cut_condition")
+cut_threshold = col_threshold.number_input("Порог", value=0.0, key="cut_threshold")
+st.line_chart(kpi_cut(cut_metric, cut_grain, cut_aggregate, cut_condition, cut_threshold, date_from, date_to, version),
+              x="period", y=cut_metric)
+
+instr.sidebar_panel()
+common.page_ready("app")
@@ -1,35 +1,36 @@
+import functools
+import importlib.metadata
+import importlib.util
+import json
+import os
+
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
 import plotly.express as px
-import pandas as pd
-
-# Создаем примерные данные
-pnl = pd.DataFrame({
-    'Показатель': ['Общие доходы', 'Издержки (R&D, ФОТ, ИТ)', 'Прибыль'],
-    'Сумма, млн руб': [120, 80, 40]
-})
-llm_effect = pd.DataFrame({
-    'Метрика': ['Доп. доход от LLM','Сэкономлено'], 
-    'Млн руб': [15, 12]
-})
-expenses = pd.DataFrame({
-    'Категория': ['R&D','ФОТ','Инфраструктура'], 
-    'Млн руб': [20, 50, 10]
-})
-teams = pd.DataFrame({
-    'Команда': ['NLP','MLOps','DevOps','PM'],
-    'План (шт)': [100, 80, 90, 50],
-    'Факт (шт)': [95, 85, 80, 60]
-})
-employees = {
-    'NLP': pd.DataFrame({'Сотрудник':['Иванов','Петров','Сидоров'], 'Выполнено': [30, 25, 40]}),
-    'MLOps': pd.DataFrame({'Сотрудник':['Кузнецов','Новикова'], 'Выполнено': [50, 35]}),
-    'DevOps': pd.DataFrame({'Сотрудник':['Федоров','Орлов','Морозова'], 'Выполнено': [20, 15, 30]}),
-    'PM': pd.DataFrame({'Сотрудник':['Семенов','Зайцева'], 'Выполнено': [10, 12]})
-}
-
-app = dash.Dash(__name__)
+
+import columnar_source as cs
+import dashboard_common as common
+from figure_store import default_store, fingerprint
+import instrumentation as instr
+
+# Drill-down в браузере (clientside callback) без обращения к серверу
+CLIENTSIDE_DRILLDOWN = os.environ.get("DASH_CLIENTSIDE_DRILLDOWN") == "1"
+# gzip-сжатие ответов callback'ов (нужен пакет flask-compress)
+COMPRESS = os.environ.get("DASH_COMPRESS", "1") == "1" and importlib.util.find_spec("flask_compress") is not None
+
+# Справочные данные из общего снимка (dashboard_common)
+reference = common.reference("app1")
+pnl = reference["pnl"]
+llm_effect = reference["llm_effect"]
+expenses = reference["expenses"]
+teams = reference["teams"]
+employees = reference["employees"]
+
+app = dash.Dash(__name__, compress=COMPRESS)
+# WSGI-точка входа для продакшена: gunicorn -c gunicorn.conf.py app1:server
+server = app.server
+figure_store = default_store()
 
 # Фигуры: P&L, эффект LLM, структура расходов, план/факт
 fig_pnl = px.bar(pnl, x='Показатель', y='Сумма, млн руб',
@@ -41,6 +42,60 @@ fig_exp = px.pie(expenses, names='Категория', values='Млн руб',
 fig_teams = px.bar(teams, x='Команда', y=['План (шт)','Факт (шт)'], 
                    title='План-Факт по AI-командам', barmode='group')
 
+
+# Фигуры drill-down строятся один раз на (команда, версия данных) и хранятся
+# в сериализованном виде: callback отдаёт готовый dict без вызова px.bar.
+# Перед lru_cache процесса стоит общее хранилище, так что воркеры gunicorn
+# строят каждую фигуру один раз на всех.
+def cached_figure(key, build):
+    figure_json = figure_store.get(key)
+    if figure_json is None:
+        with instr.section("figure.build", key=key) as span:
+            figure_json = build().to_json()
+            span.record(spec_bytes=len(figure_json))
+        figure_store.set(key, figure_json)
+        return json.loads(figure_json)
+    return figure_json
+
+
+def build_team_figure(team):
+    fig = px.bar(employees[team], x='Сотрудник', y='Выполнено',
+                 title=f'Выполнение задач: {team} (шт)')
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+# Версия данных и хэш кода фигур входят в ключ кэша: новая выгрузка или правка
+# построения не отдают старые графики, в том числе из общего хранилища
+FIGURE_CODE = fingerprint(build_team_figure, employees, importlib.metadata.version("plotly"))
+
+
+def figure_version():
+    return f"{cs.source_version()}:{FIGURE_CODE}"
+
+
+@functools.lru_cache(maxsize=256)
+def _team_figure(team, version):
+    return cached_figure(f"{version}:team:{team}", lambda: build_team_figure(team))
+
+
+def team_figure(team):
+    return _team_figure(team, figure_version())
+
+
+@functools.lru_cache(maxsize=4)
+def _empty_figure(version):
+    return cached_figure(f"{version}:empty", lambda: px.bar(title="Выберите команду"))
+
+
+def empty_figure():
+    return _empty_figure(figure_version())
+
+
+# Прогрев кэша при старте, чтобы первый клик не платил за построение
+for _team in employees:
+    team_figure(_team)
+
 app.layout = html.Div([
     html.H1("AI Operations Dashboard"),
     html.Div([
@@ -52,25 +107,50 @@ app.layout = html.Div([
         dcc.Graph(id='team-chart', figure=fig_teams, style={'width': '60%'}),
         dcc.Graph(id='detail-chart', style={'width': '35%'})
     ], style={'display': 'flex'}),
+    dcc.Store(id='team-figures', data={team: team_figure(team) for team in employees} if CLIENTSIDE_DRILLDOWN else None),
+    dcc.Store(id='empty-figure', data=empty_figure() if CLIENTSIDE_DRILLDOWN else None),
     html.Div("Нажмите на столбец команды, чтобы увидеть вклад сотрудников", style={'padding': '10px'})
 ])
+common.page_ready("app1")
 
 # Callback для drill-down: при клике на столбец команды обновляем график сотрудников
-@app.callback(
-    Output('detail-chart', 'figure'),
-    Input('team-chart', 'clickData')
-)
+@instr.timed("callback.update_detail")
 def update_detail(clickData):
     if clickData and 'points' in clickData:
         team = clickData['points'][0]['x']
         if team in employees:
-            df = employees[team]
-            fig = px.bar(df, x='Сотрудник', y='Выполнено',
-                         title=f'Выполнение задач: {team} (шт)')
-            fig.update_layout(showlegend=False)
-            return fig
+            return team_figure(team)
     # По умолчанию пустая фигура
-    return px.bar(title="Выберите команду")
+    return empty_figure()
+
+
+if CLIENTSIDE_DRILLDOWN:
+    # Все фигуры уже лежат в dcc.Store, выбор делается в браузере
+    app.clientside_callback(
+        """
+        function(clickData, figures, empty) {
+            if (clickData && clickData.points && figures[clickData.points[0].x]) {
+                return figures[clickData.points[0].x];
+            }
+            return empty;
+        }
+        """,
+        Output('detail-chart', 'figure'),
+        Input('team-chart', 'clickData'),
+        Input('team-figures', 'data'),
+        Input('empty-figure', 'data')
+    )
+else:
+    app.callback(
+        Output('detail-chart', 'figure'),
+        Input('team-chart', 'clickData')
+    )(update_detail)
+
+# Метрики процесса в формате Prometheus (при gunicorn — по каждому воркеру)
+if instr.ENABLED:
+    server.add_url_rule("/metrics", "metrics",
+                        lambda: (instr.prometheus_text(), 200, {"Content-Type": "text/plain; version=0.0.4"}))
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    # Dev-сервер Flask; в продакшене приложение поднимается через gunicorn (см. gunicorn.conf.py)
+    app.run(debug=os.environ.get("DASH_DEBUG", "1") == "1")
@@ -1,191 +1,301 @@
-import streamlit as st
 import pandas as pd
-import altair as alt
-import datetime
+import streamlit as st
+
+import assets
+import dashboard_common as common
+import data_layer as dl
+import instrumentation as instr
+from paged_table import PandasBackend, paged_table
+
+# Altair и движки разделов подключаются при первом обращении (common.lazy):
+# свёрнутые разделы страницы не платят за импорт
+alt = common.lazy("altair")
+capacity = common.lazy("capacity")
+charts = common.lazy("charts")
+cost_cube = common.lazy("cost_cube")
+timeline = common.lazy("timeline")
 
 st.set_page_config(layout="wide")
-st.image("https://upload.wikimedia.org/wikipedia/commons/8/87/Alfabank_logo.png", width=180)
+version = dl.get_source_version()
+assets.image("logo", width=180)
 
 st.title("AI Operations Dashboard – Альфа-Банк")
 st.markdown("### Финансово-операционная панель управления AI-проектами (2025–2028)")
 
+
+# Свёрнутый экспандер не считает содержимое: состояние отслеживается через
+# on_change="rerun", тело строится только когда экспандер открыт
+def lazy_expander(label, key):
+    return st.expander(label, key=key, on_change="rerun")
+
+
 # -------------------------------
 # 1. Экономика ИИ (P&L-структура)
 # -------------------------------
 st.header("📊 Экономика ИИ (P&L-структура)")
 
-st.markdown("#### 📉 Общие расходы банка vs. Экономия от ИИ")
-growth_rate = st.slider("Прогнозируемый рост эффекта ИИ (% ежегодно)", min_value=0, max_value=100, value=0, step=5)
-relative_toggle = st.checkbox("Показать в долях от общих расходов", value=False)
-
-base_expense = [450_000, 470_000, 495_000, 520_000]
-base_ai_saving = [800, 1_500, 2_500, 4_000]
-years = [2025, 2026, 2027, 2028]
-
-ai_saving_forecasted = [round(val * (1 + growth_rate / 100) ** i) for i, val in enumerate(base_ai_saving)]
-expense_data = pd.DataFrame({
-    "Год": years,
-    "Расходы банка, млн ₽": base_expense,
-    "Экономия от ИИ, млн ₽": ai_saving_forecasted
-})
-expense_data["Расходы без ИИ, млн ₽"] = expense_data["Расходы банка, млн ₽"] - expense_data["Экономия от ИИ, млн ₽"]
-
-if relative_toggle:
-    expense_data["Экономия от ИИ, %"] = round(expense_data["Экономия от ИИ, млн ₽"] / expense_data["Расходы банка, млн ₽"] * 100, 2)
-    chart = alt.Chart(expense_data).mark_line(point=True).encode(
-        x=alt.X("Год:O", title="Год"),
-        y=alt.Y("Экономия от ИИ, %:Q", title="Экономия от ИИ (%)"),
-        tooltip=["Год", "Экономия от ИИ, %"]
-    ).properties(width=500, height=300)
-    st.altair_chart(chart, use_container_width=True)
-else:
-    base = alt.Chart(expense_data).encode(x=alt.X("Год:O", title="Год"))
-    bar_base = base.mark_bar(color="#AEC6CF").encode(
-        y=alt.Y("Расходы без ИИ, млн ₽:Q", title="Расходы, млн ₽"),
-        tooltip=["Год", "Расходы банка, млн ₽", "Экономия от ИИ, млн ₽"]
-    )
-    bar_ai = base.mark_bar(color="#FF6961").encode(
-        y="Экономия от ИИ, млн ₽:Q"
-    )
-    chart = (bar_base + bar_ai).properties(width=500, height=300).configure_axis(
-        labelFontSize=12,
-        titleFontSize=14
-    ).configure_view(strokeWidth=0)
-    st.altair_chart(chart, use_container_width=True)
-
-with st.expander("📌 Из чего формируется экономия, связанная с ИИ"):
-    st.markdown("""
-    **Основные направления сокращения затрат:**
-    - 🤖 Сокращение затрат на контактный центр (chat-боты, auto-reply) — раньше 10 млн/мес, теперь 2 млн
-    - 🔍 Автоматизация проверок KYC/AML и предотвращение мошенничества
-    - 🏦 Оптимизация персонала в back office
-    - 📉 Снижение стоимости обработки транзакций через LLM
-
-    **Инвестиции в ИИ: 6 000 млн ₽**  
-    **Сокращение затрат с 2023: > 20 млн ₽ / мес**  
-    **Доля экономии от ИИ: до 6.9% от операционных расходов в 2028 году**
-    """)
-
-with st.expander("🗂️ Сравнение с аналогичными банками (peer benchmark)"):
-    benchmark = pd.DataFrame({
-        "Банк": ["Альфа-Банк", "Тинькофф", "Сбер", "ВТБ"],
-        "Экономия от ИИ, % от расходов": [6.9, 5.2, 8.5, 4.4]
-    })
-    st.bar_chart(benchmark.set_index("Банк"))
-
-with st.expander("📈 Waterfall: Эффект от ИИ по направлениям"):
-    waterfall_data = pd.DataFrame({
-        "Этап": [
-            "Инвестиции в ИИ (CapEx)",
-            "Экономия: Контактный центр",
-            "Экономия: KYC/AML",
-            "Экономия: Бэк-офис",
-            "Экономия: Обработка транзакций",
-            "Совокупный эффект"
-        ],
-        "Значение": [-6000, 96, 420, 1800, 350, 0]
-    })
-    waterfall_data.loc[5, "Значение"] = waterfall_data["Значение"][1:5].sum() - 6000
-    waterfall_data["Цвет"] = ["Инвестиции", "Экономия", "Экономия", "Экономия", "Экономия", "Итог"]
-
-    waterfall_chart = alt.Chart(waterfall_data).mark_bar().encode(
-        x=alt.X("Этап:N", sort=None, title=""),
-        y=alt.Y("Значение:Q", title="млн ₽"),
-        color=alt.Color("Цвет:N", scale=alt.Scale(
-            domain=["Инвестиции", "Экономия", "Итог"],
-            range=["#ff6961", "#77dd77", "#779ecb"]
-        )),
-        tooltip=["Этап", "Значение"]
-    ).properties(width=700, height=400)
-    st.altair_chart(waterfall_chart, use_container_width=True)
+
+# Слайдер и чекбокс перезапускают только этот фрагмент, а не всю страницу
+@st.fragment
+@instr.timed("section.economy")
+def economy_section():
+    st.markdown("#### 📉 Общие расходы банка vs. Экономия от ИИ")
+    growth_rate = st.slider("Прогнозируемый рост эффекта ИИ (% ежегодно)", min_value=0, max_value=100, value=0, step=5)
+    relative_toggle = st.checkbox("Показать в долях от общих расходов", value=False)
+
+    expense_data = dl.load_expense_data(growth_rate, version)
+    instr.record(rows=len(expense_data))
+
+    if relative_toggle:
+        chart = alt.Chart(expense_data).mark_line(point=True).encode(
+            x=alt.X("Год:O", title="Год"),
+            y=alt.Y("Экономия от ИИ, %:Q", title="Экономия от ИИ (%)"),
+            tooltip=["Год", "Экономия от ИИ, %"]
+        ).properties(width=500, height=300)
+        st.altair_chart(chart, use_container_width=True)
+    else:
+        base = alt.Chart(expense_data).encode(x=alt.X("Год:O", title="Год"))
+        bar_base = base.mark_bar(color="#AEC6CF").encode(
+            y=alt.Y("Расходы без ИИ, млн ₽:Q", title="Расходы, млн ₽"),
+            tooltip=["Год", "Расходы банка, млн ₽", "Экономия от ИИ, млн ₽"]
+        )
+        bar_ai = base.mark_bar(color="#FF6961").encode(
+            y="Экономия от ИИ, млн ₽:Q"
+        )
+        chart = (bar_base + bar_ai).properties(width=500, height=300).configure_axis(
+            labelFontSize=12,
+            titleFontSize=14
+        ).configure_view(strokeWidth=0)
+        st.altair_chart(chart, use_container_width=True)
+    instr.record(chart=chart)
+
+    with st.expander("📌 Из чего формируется экономия, связанная с ИИ"):
+        st.markdown("""
+        **Основные направления сокращения затрат:**
+        - 🤖 Сокращение затрат на контактный центр (chat-боты, auto-reply) — раньше 10 млн/мес, теперь 2 млн
+        - 🔍 Автоматизация проверок KYC/AML и предотвращение мошенничества
+        - 🏦 Оптимизация персонала в back office
+        - 📉 Снижение стоимости обработки транзакций через LLM
+
+        **Инвестиции в ИИ: 6 000 млн ₽**  
+        **Сокращение затрат с 2023: > 20 млн ₽ / мес**  
+        **Доля экономии от ИИ: до 6.9% от операционных расходов в 2028 году**
+        """)
+
+    band_expander = lazy_expander("🎲 Диапазон экономии от ИИ (Монте-Карло)", "expander_band")
+    with band_expander:
+        if band_expander.open:
+            band_data = dl.load_savings_band(growth_rate, 10.0, version)
+            band = alt.Chart(band_data).mark_area(opacity=0.3, color="#FF6961").encode(
+                x=alt.X("Год:O", title="Год"),
+                y=alt.Y("P5:Q", title="Экономия от ИИ, млн ₽"),
+                y2="P95:Q",
+                tooltip=["Год", "P5", "P50", "P95"]
+            )
+            median = alt.Chart(band_data).mark_line(point=True, color="#FF6961").encode(x="Год:O", y="P50:Q")
+            st.altair_chart((band + median).properties(width=500, height=300), use_container_width=True)
+            st.caption("10 000 сценариев: средний рост — значение слайдера, стандартное отклонение — 10 п.п. в год.")
+
+
+@st.fragment
+@instr.timed("section.benchmark")
+def benchmark_section():
+    benchmark_expander = lazy_expander("🗂️ Сравнение с аналогичными банками (peer benchmark)", "expander_benchmark")
+    with benchmark_expander:
+        if benchmark_expander.open:
+            benchmark = dl.load_benchmark(version)
+            st.bar_chart(benchmark.set_index("Банк"))
+
+
+@st.fragment
+@instr.timed("section.waterfall")
+def waterfall_section():
+    waterfall_expander = lazy_expander("📈 Waterfall: Эффект от ИИ по направлениям", "expander_waterfall")
+    with waterfall_expander:
+        if waterfall_expander.open:
+            waterfall_data = dl.load_waterfall(version)
+
+            waterfall_chart = alt.Chart(waterfall_data).mark_bar().encode(
+                x=alt.X("Этап:N", sort=None, title=""),
+                y=alt.Y("Значение:Q", title="млн ₽"),
+                color=alt.Color("Цвет:N", scale=alt.Scale(
+                    domain=["Инвестиции", "Экономия", "Итог"],
+                    range=["#ff6961", "#77dd77", "#779ecb"]
+                )),
+                tooltip=["Этап", "Значение"]
+            ).properties(width=700, height=400)
+            st.altair_chart(waterfall_chart, use_container_width=True)
+            instr.record(rows=len(waterfall_data), chart=waterfall_chart)
+
+
+economy_section()
+benchmark_section()
+waterfall_section()
+
 # -------------------------------
 # 2. Структура расходов (MECE)
 # -------------------------------
 st.header("📂 Расходы на AI-проекты, млн ₽")
 
-with st.expander("📌 Детализация"):
-    spending = pd.DataFrame({
-        "Категория": [
-            "ФОТ — NLP (6 чел)", "ФОТ — MLOps (4 чел)", "ФОТ — DevOps (3 чел)", "ФОТ — PM (2 чел)",
-            "R&D — эксперименты", "R&D — лицензии LLM", "Инфраструктура — GPU", "Инфраструктура — облако", "PM / Support / QA"
-        ],
-        "2025": [1_200, 900, 600, 300, 600, 400, 700, 500, 400],
-        "2026": [1_400, 1_000, 650, 320, 700, 450, 750, 550, 450]
-    })
-    st.dataframe(spending.set_index("Категория"))
+
+@st.fragment
+@instr.timed("section.spending")
+def spending_section():
+    spending_expander = lazy_expander("📌 Детализация", "expander_spending")
+    with spending_expander:
+        if spending_expander.open:
+            cube = dl.load_cost_cube(version)
+            years = list(cube.total().index)
+            st.dataframe(cost_cube.yoy(cube.children(), years[0], years[-1]))
+
+            category = st.selectbox("Категория", list(cube.children().index))
+            st.dataframe(cost_cube.yoy(cube.children(Категория=category), years[0], years[-1]))
+
+            monthly = cube.level("Месяц", Категория=category).groupby(level="Месяц").sum()
+            monthly = monthly.reset_index().melt(id_vars="Месяц", var_name="Год", value_name="млн ₽")
+            st.altair_chart(alt.Chart(monthly).mark_bar().encode(
+                x=alt.X("Месяц:O"),
+                y=alt.Y("млн ₽:Q"),
+                color="Год:N",
+                xOffset="Год:N",
+                tooltip=["Год", "Месяц", "млн ₽"]
+            ).properties(height=250, title=f"{category}: расходы по месяцам"), use_container_width=True)
+
+
+spending_section()
 
 # -------------------------------
 # 3. KPI команд (план / факт / RAG)
 # -------------------------------
 st.header("📌 KPI команд (план / факт / статус RAG)")
 
-kpi_data = pd.DataFrame({
-    "Команда": ["NLP", "MLOps", "DevOps", "PM"],
-    "Показатель": ["Precision классификации", "% CI/CD-деплоев", "Аптайм сервисов", "Кол-во MVP за квартал"],
-    "План": [0.92, 0.97, 99.9, 8],
-    "Факт": [0.89, 0.95, 99.5, 6],
-    "RAG": ["🟠", "🟠", "🟢", "🔴"]
-})
 
-st.dataframe(kpi_data)
+@st.fragment
+@instr.timed("section.kpi")
+def kpi_section():
+    paged_table(dl.load_kpi_table(version), "kpi")
+
+
+kpi_section()
 
 # -------------------------------
 # 4. Индивидуальные результаты
 # -------------------------------
 st.header("🧑‍💻 Индивидуальные результаты сотрудников")
 
-team_choice = st.selectbox("Выберите команду", ["NLP", "MLOps", "DevOps", "PM"])
-
-employee_data = {
-    "NLP": pd.DataFrame({
-        "Сотрудник": ["Иванов", "Петров", "Сидоров"],
-        "План задач": [28, 30, 26],
-        "Факт задач": [25, 30, 28]
-    }),
-    "MLOps": pd.DataFrame({
-        "Сотрудник": ["Новикова", "Фролов"],
-        "План задач": [38, 36],
-        "Факт задач": [40, 35]
-    }),
-    "DevOps": pd.DataFrame({
-        "Сотрудник": ["Орлов", "Морозов", "Зайцева"],
-        "План задач": [20, 20, 23],
-        "Факт задач": [20, 18, 25]
-    }),
-    "PM": pd.DataFrame({
-        "Сотрудник": ["Семенов", "Григорьева"],
-        "План задач": [12, 10],
-        "Факт задач": [10, 12]
-    })
-}
-
-df = employee_data[team_choice]
-df["Исполнение, %"] = (df["Факт задач"] / df["План задач"] * 100).round(1)
-df = df.sort_values("Исполнение, %", ascending=False).reset_index(drop=True)
-
-st.dataframe(df)
+
+@st.fragment
+@instr.timed("section.employees")
+def employees_section():
+    team_choice = st.selectbox("Выберите команду", dl.TEAMS)
+
+    paged_table(dl.load_employee_table(version), "employees", filters={"Команда": team_choice},
+                sort_by="Исполнение, %", ascending=False)
+
+
+employees_section()
 
 # -------------------------------
 # 5. План-график (Gantt)
 # -------------------------------
 st.header("📅 План-график AI-проектов")
 
-gantt_data = pd.DataFrame({
-    "Проект": ["Запуск чат-бота", "Модель оценки риска", "Интеграция CI/CD", "LLM в КЦ", "Облачная миграция"],
-    "Начало": [datetime.date(2025, 1, 15), datetime.date(2025, 2, 10), datetime.date(2025, 3, 1),
-               datetime.date(2025, 3, 20), datetime.date(2025, 4, 5)],
-    "Окончание": [datetime.date(2025, 2, 28), datetime.date(2025, 4, 1), datetime.date(2025, 4, 10),
-                  datetime.date(2025, 6, 1), datetime.date(2025, 6, 30)]
-})
-
-gantt_chart = alt.Chart(gantt_data).mark_bar().encode(
-    x='Начало:T',
-    x2='Окончание:T',
-    y=alt.Y('Проект:N', sort=None),
-    color=alt.value("#007BFF")
-).properties(height=300)
 
-st.altair_chart(gantt_chart, use_container_width=True)
+# Сценарий "перенос проекта": трекер загрузки команды проекта живёт в сессии, пока не
+# сменились окно и фильтры; сдвиг дат пересчитывает только выбранную задачу (O(log D)),
+# прежде сдвинутый проект возвращается на свои даты
+def shift_scenario(visible, window, limit):
+    st.markdown("##### Перенос проекта")
+    col_project, col_shift = st.columns([2, 1])
+    row = col_project.selectbox("Проект", visible.index, key="shift_project",
+                                format_func=lambda i: f"{visible.at[i, 'Проект']} ({visible.at[i, 'Начало']:%d.%m.%Y})")
+    shift = int(col_shift.number_input("Сдвиг, дней", value=0, step=7, key="shift_days"))
+    rows = visible
+    if "Команда" in visible.columns:
+        rows = visible[visible["Команда"] == visible.at[row, "Команда"]]
+    key = (version, tuple(window), tuple(rows.index))
+    state = st.session_state.get("capacity_tracker")
+    if state is None or state["key"] != key:
+        state = {"key": key, "tracker": capacity.CapacityTracker(rows, *window), "shifts": {}, "base": {}}
+        st.session_state["capacity_tracker"] = state
+    tracker, shifts, base = state["tracker"], state["shifts"], state["base"]
+    for other in [other for other in shifts if other != row]:
+        tracker.update(other, rows.at[other, "Начало"], rows.at[other, "Окончание"])
+        del shifts[other]
+    if row not in base:
+        base[row] = (tracker.overlaps(row), tracker.peak(row))
+    if shifts.get(row, 0) != shift:
+        delta = pd.Timedelta(days=shift)
+        tracker.update(row, rows.at[row, "Начало"] + delta, rows.at[row, "Окончание"] + delta)
+        shifts[row] = shift
+    if not tracker.in_window(row):
+        st.info("После сдвига проект выходит за выбранное окно")
+        return
+    overlaps, peak = tracker.overlaps(row), tracker.peak(row)
+    col_overlaps, col_peak = st.columns(2)
+    col_overlaps.metric("Пересечений с проектами команды", overlaps, delta=overlaps - base[row][0], delta_color="inverse")
+    col_peak.metric("Пик загрузки в период проекта", peak, delta=peak - base[row][1], delta_color="inverse")
+    if peak > limit:
+        st.warning(f"В период проекта загрузка превышает допустимую ({limit})")
+
+
+# Окно дат и фильтры применяются на сервере, в график уходят только видимые полосы
+@st.fragment
+@instr.timed("section.gantt")
+def gantt_section():
+    timeline_index = dl.load_timeline_index(version)
+    date_min, date_max = timeline_index.bounds()
+    if date_min is None:
+        st.info("Нет проектов в план-графике")
+        return
+    col_window, col_status, col_team = st.columns([2, 1, 1])
+    with col_window:
+        window = st.slider("Период", min_value=date_min.date(), max_value=date_max.date(),
+                           value=(date_min.date(), date_max.date()), format="DD.MM.YYYY")
+    with col_status:
+        statuses = st.multiselect("Статус", timeline.STATUSES)
+    with col_team:
+        teams = None
+        if "Команда" in timeline_index.frame.columns:
+            teams = st.multiselect("Команда", sorted(timeline_index.frame["Команда"].unique()))
+
+    visible = timeline_index.query(window[0], window[1], teams, statuses)
+    with instr.section("gantt.chart") as span:
+        gantt_chart = timeline.timeline_chart(visible, window[0], window[1])
+        span.record(rows=len(visible), chart=gantt_chart)
+    st.altair_chart(gantt_chart, use_container_width=True)
+    st.caption(f"Проектов в окне: {len(visible)}")
+
+    capacity_expander = lazy_expander("⚖️ Загрузка портфеля и сдвиг сроков", "expander_capacity")
+    with capacity_expander:
+        if capacity_expander.open:
+            limit = st.number_input("Допустимо параллельных проектов на команду", min_value=1, value=3, step=1)
+            with instr.section("gantt.capacity") as span:
+                load = capacity.daily_load(visible, window[0], window[1])
+                span.record(rows=len(visible))
+            if load.empty:
+                st.info("В выбранном окне нет проектов — загрузку считать не по чему")
+            else:
+                load_chart = alt.Chart(load).mark_area(opacity=0.6).encode(
+                    x=alt.X("День:T", title=""),
+                    y=alt.Y("Проектов:Q", title="Параллельных проектов"),
+                    color="Команда:N",
+                    tooltip=["Команда", "День", "Проектов"]
+                ).properties(height=200)
+                limit_rule = alt.Chart().mark_rule(color="#FF6961", strokeDash=[4, 4]).encode(y=alt.datum(limit))
+                st.altair_chart(load_chart + limit_rule, use_container_width=True)
+                overloaded = capacity.conflicts(load, limit)
+                if overloaded.empty:
+                    st.success("Перегруженных дней нет")
+                else:
+                    paged_table(PandasBackend(overloaded), "overloaded")
+                shift_scenario(visible, window, limit)
+            # Сдвиг сроков — только по проектам окна и фильтров план-графика
+            slippage = dl.load_slippage(version)
+            paged_table(PandasBackend(slippage[slippage.index.isin(visible.index)]), "slippage")
+
+
+gantt_section()
 
 
 st.markdown("### Финансово-операционная панель управления AI-проектами (2025–2028)")
@@ -196,100 +306,59 @@ st.markdown("### Финансово-операционная панель упр
 # -------------------------------
 st.header("📈 Индивидуальные дашборды проектов")
 
-# -- Основные метрики по кварталам --
-project_data = pd.DataFrame({
-    "Проект": ["Запуск чат-бота"] * 4 + ["Модель оценки риска"] * 4 + ["Интеграция CI/CD"] * 4 + ["LLM в КЦ"] * 4 + ["Облачная миграция"] * 4,
-    "Квартал": ["Q1", "Q2", "Q3", "Q4"] * 5,
-    "Прогресс, %": [20, 50, 80, 100, 10, 35, 60, 100, 25, 55, 85, 100, 15, 40, 70, 95, 5, 30, 60, 100],
-    "CSAT, %": [87, 89, 90, 91, 82, 85, 88, 90, 80, 82, 85, 87, 88, 89, 91, 93, 83, 84, 86, 88],
-    "Отклонение от срока, дней": [0, 1, -2, -3, 5, 3, 0, -1, 2, 0, -2, -4, 1, 0, -1, -2, 7, 5, 1, 0]
-})
-
-# -- Новые метрики (по дате) --
-voc_data = pd.DataFrame({
-    "Проект": ["Запуск чат-бота"] * 3,
-    "Дата": pd.to_datetime(["2025-01-31", "2025-02-28", "2025-03-31"]),
-    "VOC, %": [72, 75, 78]
-})
-
-accuracy_data = pd.DataFrame({
-    "Проект": ["Запуск чат-бота"] * 6,
-    "Дата": pd.to_datetime(["2025-03-01", "2025-03-08", "2025-03-15", "2025-03-22", "2025-03-29", "2025-04-05"]),
-    "Достоверность, %": [87, 88, 90, 91, 92, 91]
-})
-
-# -- Выбор проекта --
-selected_project = st.selectbox("Выберите проект для анализа:", project_data["Проект"].unique())
-
-# -- Фильтрация по выбранному проекту --
-project_subset = project_data[project_data["Проект"] == selected_project]
-voc_subset = voc_data[voc_data["Проект"] == selected_project]
-accuracy_subset = accuracy_data[accuracy_data["Проект"] == selected_project]
-# -- Основные графики --
-st.subheader(f"📊 Ключевые метрики: {selected_project}")
-
-chart_progress = alt.Chart(project_subset).mark_line(point=True, color="#007BFF").encode(
-    x=alt.X("Квартал:O"),
-    y=alt.Y("Прогресс, %:Q"),
-    tooltip=["Квартал", "Прогресс, %"]
-).properties(height=250, title="Динамика прогресса проекта")
-
-chart_csat = alt.Chart(project_subset).mark_line(point=True, color="#00CC88").encode(
-    x=alt.X("Квартал:O"),
-    y=alt.Y("CSAT, %:Q"),
-    tooltip=["Квартал", "CSAT, %"]
-).properties(height=250, title="Удовлетворённость (CSAT)")
-
-chart_delay = alt.Chart(project_subset).mark_bar(color="#FF9966").encode(
-    x=alt.X("Квартал:O"),
-    y=alt.Y("Отклонение от срока, дней:Q"),
-    tooltip=["Квартал", "Отклонение от срока, дней"]
-).properties(height=250, title="Отклонение от срока (в днях)")
-
-st.altair_chart(chart_progress, use_container_width=True)
-st.altair_chart(chart_csat, use_container_width=True)
-st.altair_chart(chart_delay, use_container_width=True)
-
-# -- VOC график --
-if not voc_subset.empty:
-    voc_chart = alt.Chart(voc_subset).mark_line(point=True, color="#6A5ACD").encode(
-        x=alt.X("Дата:T", title="Месяц"),
-        y=alt.Y("VOC, %:Q", title="VOC (%)", scale=alt.Scale(domain=[70, 100])),  # Установка границ по y
-        tooltip=["Дата", "VOC, %"]
-    ).properties(height=250, title="📣 Оценка голоса клиента (VOC)") \
-     .configure_axis(labelFontSize=12, titleFontSize=14)
-    
-    st.altair_chart(voc_chart, use_container_width=True)
-
-# -- Accuracy график --
-if not accuracy_subset.empty:
-    acc_chart = alt.Chart(accuracy_subset).mark_line(point=True, color="#DC143C").encode(
-        x=alt.X("Дата:T", title="Дата замера"),
-        y=alt.Y("Достоверность, %:Q", title="Достоверность (%)", scale=alt.Scale(domain=[85, 100])),
-        tooltip=["Дата", "Достоверность, %"]
-    ).properties(height=250, title="✅ Точность ответов (достоверность)") \
-     .configure_axis(labelFontSize=12, titleFontSize=14)
-    
-    st.altair_chart(acc_chart, use_container_width=True)
-
-# -- Таймлайн проекта --
-st.subheader("📅 Таймлайн проекта")
-project_timeline = pd.DataFrame({
-    "Проект": ["Запуск чат-бота", "Модель оценки риска", "Интеграция CI/CD", "LLM в КЦ", "Облачная миграция"],
-    "Начало": [datetime.date(2025, 1, 15), datetime.date(2025, 2, 10), datetime.date(2025, 3, 1),
-               datetime.date(2025, 3, 20), datetime.date(2025, 4, 5)],
-    "Окончание": [datetime.date(2025, 2, 28), datetime.date(2025, 4, 1), datetime.date(2025, 4, 10),
-                  datetime.date(2025, 6, 1), datetime.date(2025, 6, 30)]
-})
-
-timeline_chart = alt.Chart(project_timeline[project_timeline["Проект"] == selected_project]).mark_bar().encode(
-    x='Начало:T',
-    x2='Окончание:T',
-    y=alt.Y('Проект:N', sort=None),
-    color=alt.value("#007BFF")
-).properties(height=100)
-
-st.altair_chart(timeline_chart, use_container_width=True)
+
+# Срез портфеля по кварталам: агрегация и порог выполняются SQL-запросом DuckDB
+@st.fragment
+@instr.timed("section.portfolio_cut")
+def portfolio_cut_section():
+    cut_expander = lazy_expander("🔎 Срез портфеля по кварталам", "expander_portfolio_cut")
+    with cut_expander:
+        if cut_expander.open:
+            col_metric, col_agg, col_threshold = st.columns(3)
+            metric = col_metric.selectbox("Метрика", dl.PROJECT_METRICS, key="cut_metric")
+            aggregate = col_agg.selectbox("Агрегат", ["avg", "median", "min", "max", "p95"], key="cut_aggregate",
+                                          format_func={"avg": "Среднее", "median": "Медиана", "min": "Минимум",
+                                                       "max": "Максимум", "p95": "95-й перцентиль"}.get)
+            threshold = col_threshold.number_input("Не ниже порога", value=None, key="cut_threshold")
+            cut = dl.load_portfolio_cut(metric, aggregate, threshold, version)
+            instr.record(rows=cut.num_rows)
+            st.altair_chart(alt.Chart(cut).mark_bar(color="#007BFF").encode(
+                x=alt.X("Квартал:O"),
+                y=alt.Y(f"{metric}:Q"),
+                tooltip=["Квартал", f"{metric}:Q", "Проектов:Q"]
+            ).properties(height=250), use_container_width=True)
+
+
+portfolio_cut_section()
+
+
+# Выбор проекта перерисовывает только проектный дашборд
+@st.fragment
+@instr.timed("section.project")
+def project_section():
+    # -- Выбор проекта --
+    selected_project = st.selectbox("Выберите проект для анализа:", dl.list_projects(version))
+
+    # -- Срез по выбранному проекту (кэшируется по проекту и версии данных) --
+    project_subset, voc_subset, accuracy_subset, timeline_subset = dl.load_project_slice(selected_project, version)
+    # -- Основные графики --
+    st.subheader(f"📊 Ключевые метрики: {selected_project}")
+
+    project_charts = charts.project_charts(project_subset, voc_subset, accuracy_subset, timeline_subset)
+    for name, chart in project_charts.items():
+        if name == "timeline":
+            st.subheader("📅 Таймлайн проекта")
+        st.altair_chart(chart, use_container_width=True)
+
+    instr.record(rows=len(project_subset) + len(voc_subset) + len(accuracy_subset))
+    for name in ("progress", "csat", "delay", "timeline"):
+        instr.record(chart=project_charts[name])
+
+
+project_section()
 
 st.markdown("---")
 st.caption("© 2025 AI & LLM Business Dashboard для Альфа-Банка. Все данные — демонстрационные (mock).")
+
+instr.sidebar_panel()
+common.page_ready("app_final_gantt")
@@ -0,0 +1,58 @@
+import functools
+import os
+
+# -------------------------------
+# Локальные статические ресурсы (логотипы)
+# -------------------------------
+# Картинки лежат в каталоге assets/ рядом со страницами (DASHBOARD_ASSETS_DIR),
+# а не на внешнем хосте: в закрытом контуре upload.wikimedia.org недоступен, и
+# страница не должна ждать чужой сервер. Логотипы — SVG, поэтому масштабируются
+# браузером без пересборки под ширину, а Streamlit встраивает их в страницу
+# data-URL — это сотни байт без отдельного запроса за картинкой. Файл читается
+# один раз на процесс (ключ — mtime). Нет файла — выводится текст.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.environ.get("DASHBOARD_ASSETS_DIR", os.path.join(ROOT, "assets"))
+
+# Имя ресурса -> файл в ASSETS_DIR и текст-заглушка
+ASSETS = {
+    "logo": {"file": "alfabank_logo.svg", "alt": "Альфа-Банк"},
+    "logo_2021": {"file": "alfa_bank_logo_2021.svg", "alt": "Альфа-Банк"},
+}
+
+
+def source_path(name):
+    path = os.path.join(ASSETS_DIR, ASSETS[name]["file"])
+    return path if os.path.isfile(path) else None
+
+
+# Ключ — (имя, mtime исходника): заменили файл — читается новая версия
+@functools.lru_cache(maxsize=64)
+def _read(name, mtime):
+    with open(source_path(name), "rb") as f:
+        return f.read()
+
+
+# Байты ресурса или None, если файла нет
+def resolve(name):
+    path = source_path(name)
+    if path is None:
+        return None
+    try:
+        return _read(name, os.path.getmtime(path))
+    except OSError:
+        return None
+
+
+def image(name, width, container=None):
+    import streamlit as st
+
+    container = container or st
+    data = resolve(name)
+    if data is None:
+        container.markdown(f"**{ASSETS[name]['alt']}**")
+    elif ASSETS[name]["file"].endswith(".svg"):
+        # SVG Streamlit принимает разметкой, а не байтами
+        container.image(data.decode("utf-8"), width=width)
+    else:
+        container.image(data, width=width)
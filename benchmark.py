@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Бенчмарк отрисовки и перезапусков дашбордов
+# -------------------------------
+# Streamlit-страницы прогоняются через streamlit.testing.v1.AppTest, app1.py —
+# через тестовый клиент Flask под Dash. Для каждого масштаба (10×, 100×, 1000×)
+# синтетические данные (synthetic_data.py) пишутся в колоночное хранилище во
+# временном каталоге, каждое приложение запускается в отдельном процессе
+# (чистые кэши и честная пиковая память). Скрипт взаимодействий повторяет действия пользователя:
+# проход слайдером, переключение selectbox, клики по графику.
+# app2.py, app3.py и app1.py держат данные в коде страницы — для них масштаб
+# не меняет объём данных, их строки служат базовой линией.
+# Результат — по одной JSON-строке на (приложение, масштаб):
+#   python benchmark.py --scales 10 100 1000 --rounds 3 > bench_output.txt
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APPS = ["app.py", "app2.py", "app3.py", "app_final_gantt.py", "app1.py"]
+CHART_TYPES = ("vega_lite_chart", "arrow_vega_lite_chart", "plotly_chart")
+
+
+# -- Данные --
+# Масштаб 1× — объёмы mock-кадров data_layer; данные строит synthetic_data
+def build_store(data_dir, scale):
+    import synthetic_data
+
+    sizes = {
+        "projects": 5 * scale,
+        "kpi_rows": 30 * scale,
+        "kpi_freq": "1D",
+        "voc_points": 3,
+        "accuracy_points": 6,
+        "employees": 10 * scale,
+        "kpi_teams": 4 * scale,
+        "spending": 9 * scale,
+    }
+    return synthetic_data.generate_store(data_dir, sizes, seed=scale)
+
+
+# -- Метрики --
+def percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 2) if values else None
+
+
+# VmHWM сбрасывается при exec, ru_maxrss наследует пик родительского процесса
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _elements(node):
+    children = getattr(node, "children", None)
+    if children is None:
+        if getattr(node, "proto", None) is not None:
+            yield node
+        return
+    for child in children.values():
+        yield from _elements(child)
+
+
+# Размер сообщений, которые ушли бы в браузер: всё дерево и отдельно спецификации графиков
+def payload_bytes(at):
+    total = charts = 0
+    for element in _elements(at._tree):
+        size = element.proto.ByteSize()
+        total += size
+        if element.type in CHART_TYPES:
+            charts += size
+    return total, charts
+
+
+# -- Сценарии взаимодействий Streamlit --
+def _by_label(widgets, label):
+    return next(w for w in widgets if w.label.startswith(label))
+
+
+def _app_actions(at, i):
+    import downsampling
+
+    methods = list(downsampling.METHODS)
+    date_from, date_to = at.date_input[0].value
+    shift = pd.Timedelta(days=(i % 5) * max((date_to - date_from).days // 10, 1))
+    return [
+        lambda: _by_label(at.selectbox, "Прореживание").set_value(methods[i % len(methods)]),
+        lambda: at.date_input[0].set_value((date_from + shift, date_to)),
+    ]
+
+
+def _team_actions(at, i):
+    teams = ["NLP", "MLOps", "DevOps", "PM"]
+    return [lambda: _by_label(at.selectbox, "Выберите команду").set_value(teams[i % len(teams)])]
+
+
+def _select(at, label, i):
+    widget = _by_label(at.selectbox, label)
+    widget.set_value(widget.options[i % len(widget.options)])
+
+
+def _gantt_actions(at, i):
+    actions = [
+        lambda v=value: _by_label(at.slider, "Прогнозируемый рост").set_value(v)
+        for value in range(0, 101, 25)
+    ]
+    return actions + [
+        lambda: at.checkbox[0].set_value(i % 2 == 0),
+        lambda: _select(at, "Выберите команду", i),
+        lambda: _select(at, "Выберите проект", i),
+    ]
+
+
+SCRIPTS = {
+    "app.py": _app_actions,
+    "app2.py": _team_actions,
+    "app3.py": _team_actions,
+    "app_final_gantt.py": _gantt_actions,
+}
+
+
+def bench_streamlit(app, rounds):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, app), default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    timings = []
+    for i in range(rounds):
+        for action in SCRIPTS[app](at, i):
+            action()
+            start = time.perf_counter()
+            at.run()
+            timings.append(time.perf_counter() - start)
+    total, charts = payload_bytes(at)
+    return {
+        "cold_ms": round(cold * 1000, 2),
+        "reruns": len(timings),
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        "payload_bytes": total,
+        "spec_bytes": charts,
+        "exceptions": [e.value for e in at.exception],
+    }
+
+
+# -- Dash (app1.py) --
+def bench_dash(rounds):
+    sys.path.insert(0, ROOT)
+    from loadtest_app1 import TEAMS, payload
+
+    start = time.perf_counter()
+    import app1
+    client = app1.server.test_client()
+    layout = client.get("/_dash-layout")
+    cold = time.perf_counter() - start
+    timings, sizes = [], []
+    for i in range(rounds):
+        for team in TEAMS:
+            start = time.perf_counter()
+            response = client.post("/_dash-update-component", data=payload(team),
+                                   headers={"Content-Type": "application/json"})
+            timings.append(time.perf_counter() - start)
+            sizes.append(len(response.data))
+    return {
+        "cold_ms": round(cold * 1000, 2),
+        "reruns": len(timings),
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        "payload_bytes": len(layout.data) + max(sizes, default=0),
+        "spec_bytes": max(sizes, default=0),
+        "exceptions": [],
+    }
+
+
+def child(app, scale, rounds):
+    result = bench_dash(rounds) if app == "app1.py" else bench_streamlit(app, rounds)
+    # Холодный старт процесса: ленивые импорты, снимок справочных данных, первая отрисовка
+    common = sys.modules.get("dashboard_common")
+    startup = dict(common.STARTUP) if common is not None else {}
+    # Размер кадров по датасетам до и после приведения типов (schema_registry)
+    registry = sys.modules.get("schema_registry")
+    memory = registry.memory() if registry is not None else {}
+    print(json.dumps({"app": app, "scale": scale, **result, "peak_rss_mb": peak_rss_mb(), "startup": startup,
+                      "memory": memory}, ensure_ascii=False), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк отрисовки и перезапусков дашбордов")
+    parser.add_argument("--apps", nargs="+", default=APPS)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.scale, args.rounds)
+        return
+
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{scale}x-") as data_dir:
+            rows = build_store(data_dir, scale)
+            print(json.dumps({"scale": scale, "rows": rows}, ensure_ascii=False), flush=True)
+            env = dict(os.environ, DASHBOARD_DATA_DIR=data_dir, DASH_DEBUG="0")
+            env.pop("DASHBOARD_DATA_VERSION", None)
+            for app in args.apps:
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--child", app, "--scale", str(scale), "--rounds", str(args.rounds)],
+                    env=env, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                )
+                lines = proc.stdout.strip().splitlines()
+                if proc.returncode or not lines:
+                    print(json.dumps({"app": app, "scale": scale, "error": f"exit code {proc.returncode}"}), flush=True)
+                else:
+                    print(lines[-1], flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Загрузка портфеля: параллельные проекты, пересечения, сдвиг сроков
+# -------------------------------
+# Всё считается sweep-line'ом по отсортированным датам, без попарных сравнений:
+# число активных задач на день — разностный массив (+1 в день начала, -1 после
+# дня окончания) и cumsum.
+# CapacityTracker обновляет загрузку при изменении дат одной задачи за O(log D)
+# через дерево Фенвика по дням — на нём построен сценарий "перенос проекта"
+# на странице: сдвиг дат пересчитывает только одну задачу.
+
+TEAM_COLUMN = "Команда"
+ALL_TEAMS = "Все"
+
+
+def _days(values, origin):
+    return ((pd.to_datetime(values).to_numpy(dtype="datetime64[D]") - origin) // np.timedelta64(1, "D")).astype(np.int64)
+
+
+# Активных задач на каждый день диапазона, отдельно по командам
+def daily_load(df, date_from=None, date_to=None, team_column=TEAM_COLUMN):
+    starts = pd.to_datetime(df["Начало"])
+    ends = pd.to_datetime(df["Окончание"])
+    date_from = pd.Timestamp(date_from if date_from is not None else starts.min()).normalize()
+    date_to = pd.Timestamp(date_to if date_to is not None else ends.max()).normalize()
+    days = pd.date_range(date_from, date_to, freq="D")
+    origin = np.datetime64(date_from, "D")
+    teams = df[team_column] if team_column in df.columns else pd.Series(ALL_TEAMS, index=df.index)
+    frames = []
+    for team, index in teams.groupby(teams, observed=True).groups.items():
+        s = np.clip(_days(starts[index], origin), 0, len(days))
+        e = np.clip(_days(ends[index], origin) + 1, 0, len(days))
+        diff = np.bincount(s, minlength=len(days) + 1) - np.bincount(e, minlength=len(days) + 1)
+        frames.append(pd.DataFrame({TEAM_COLUMN: team, "День": days, "Проектов": np.cumsum(diff)[:len(days)]}))
+    if not frames:
+        return pd.DataFrame(columns=[TEAM_COLUMN, "День", "Проектов"])
+    return pd.concat(frames, ignore_index=True)
+
+
+# Дни, когда загрузка команды превышает capacity
+def conflicts(load, capacity):
+    over = load[load["Проектов"] > capacity]
+    return over.assign(**{"Превышение": over["Проектов"] - capacity})
+
+
+# Прогноз окончания с учётом последнего отклонения от срока; отмечаются проекты,
+# которые заканчиваются последними (зависимостей между проектами в данных нет)
+def slippage(timeline, project_data):
+    last_delay = project_data.groupby("Проект", observed=True, sort=False)["Отклонение от срока, дней"].last()
+    result = timeline[["Проект", "Начало", "Окончание"]].copy()
+    result["Отклонение, дней"] = result["Проект"].map(last_delay).fillna(0).astype(int)
+    result["Прогноз окончания"] = pd.to_datetime(result["Окончание"]) + pd.to_timedelta(result["Отклонение, дней"], unit="D")
+    latest = result["Прогноз окончания"].max()
+    result["Последний срок"] = result["Прогноз окончания"] == latest
+    # Индекс строк плана сохраняется — по нему страница оставляет только видимые проекты
+    return result.sort_values("Прогноз окончания", ascending=False, kind="stable")
+
+
+class _Fenwick:
+    def __init__(self, size):
+        self.tree = np.zeros(size + 1, dtype=np.int64)
+
+    # Дерево по готовому массиву за O(n) вместо n вставок
+    @classmethod
+    def from_array(cls, values):
+        fenwick = cls(len(values))
+        tree = fenwick.tree
+        tree[1:] = values
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        return fenwick
+
+    def add(self, i, delta):
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        i += 1
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return int(total)
+
+
+# Инкрементальная загрузка: изменение дат одной задачи — O(log D) для загрузки
+# и O(log n) поиска для пересечений вместо пересчёта всего портфеля.
+# Задачи ключуются идентификатором строки (имена проектов могут повторяться);
+# задачи целиком вне окна в загрузку не входят, частично попавшие обрезаются окном
+class CapacityTracker:
+    def __init__(self, df, date_from, date_to):
+        self.origin = np.datetime64(pd.Timestamp(date_from).normalize(), "D")
+        self.days = int((np.datetime64(pd.Timestamp(date_to).normalize(), "D") - self.origin) // np.timedelta64(1, "D")) + 1
+        # Начальное состояние — одним проходом: разностный массив, один sort списков
+        starts, ends = _days(df["Начало"], self.origin), _days(df["Окончание"], self.origin)
+        inside = (ends >= 0) & (starts < self.days)
+        starts, ends = np.clip(starts, 0, self.days - 1), np.clip(ends, 0, self.days - 1)
+        self.tasks = {row: (int(s), int(e)) if ok else None for row, s, e, ok in zip(df.index, starts, ends, inside)}
+        starts, ends = starts[inside], ends[inside]
+        diff = np.bincount(starts, minlength=self.days + 1) - np.bincount(ends + 1, minlength=self.days + 1)
+        self.tree = _Fenwick.from_array(diff[:self.days + 1])
+        self.starts = sorted(starts.tolist())
+        self.ends = sorted(ends.tolist())
+
+    def _day(self, value):
+        return int((np.datetime64(pd.Timestamp(value), "D") - self.origin) // np.timedelta64(1, "D"))
+
+    def add(self, row, start, end):
+        s, e = self._day(start), self._day(end)
+        if e < 0 or s >= self.days:
+            self.tasks[row] = None
+            return
+        s, e = max(s, 0), min(e, self.days - 1)
+        self.tasks[row] = (s, e)
+        self.tree.add(s, 1)
+        self.tree.add(e + 1, -1)
+        bisect.insort(self.starts, s)
+        bisect.insort(self.ends, e)
+
+    def remove(self, row):
+        span = self.tasks.pop(row)
+        if span is None:
+            return
+        s, e = span
+        self.tree.add(s, -1)
+        self.tree.add(e + 1, 1)
+        del self.starts[bisect.bisect_left(self.starts, s)]
+        del self.ends[bisect.bisect_left(self.ends, e)]
+
+    def update(self, row, start, end):
+        self.remove(row)
+        self.add(row, start, end)
+
+    def in_window(self, row):
+        return self.tasks[row] is not None
+
+    def load_on(self, day):
+        day = self._day(day)
+        return self.tree.prefix(day) if 0 <= day < self.days else 0
+
+    # Наибольшая загрузка за дни задачи (вместе с ней самой): внутри отрезка загрузка
+    # растёт только в дни начала задач, поэтому достаточно проверить их и первый день
+    def peak(self, row):
+        if self.tasks[row] is None:
+            return 0
+        s, e = self.tasks[row]
+        days = {s, *self.starts[bisect.bisect_right(self.starts, s):bisect.bisect_right(self.starts, e)]}
+        return max(self.tree.prefix(day) for day in days)
+
+    def overlaps(self, row):
+        if self.tasks[row] is None:
+            return 0
+        s, e = self.tasks[row]
+        return bisect.bisect_right(self.starts, e) - bisect.bisect_left(self.ends, s) - 1
@@ -0,0 +1,98 @@
+import json
+
+import altair as alt
+import streamlit as st
+
+import kpi_analytics
+
+# -------------------------------
+# Построение Altair-графиков без transform_fold
+# -------------------------------
+# Широкие кадры разворачиваются в длинный формат один раз на стороне pandas
+# (результат кэшируется), в спецификацию попадают только нужные колонки, а
+# браузерному Vega не приходится делать fold на каждом рендере.
+# Altair выносит данные в именованные datasets по хэшу содержимого, поэтому
+# одинаковый кадр в составном графике (layer/concat) хранится один раз;
+# st.altair_chart передаёт эти datasets в браузер в формате Arrow, а не JSON.
+
+
+@st.cache_data(ttl=600, max_entries=128, show_spinner=False)
+def melt(df, id_column, value_columns, var_name="key", value_name="value"):
+    long = df.melt(id_vars=[id_column], value_vars=list(value_columns), var_name=var_name, value_name=value_name)
+    long[var_name] = long[var_name].astype("category")
+    return long
+
+
+# Замена alt.Chart(df).transform_fold(columns, as_=[key, value])
+def fold_chart(df, id_column, value_columns, as_=("key", "value")):
+    var_name, value_name = as_
+    return alt.Chart(melt(df, id_column, tuple(value_columns), var_name, value_name))
+
+
+# Размер спецификации в байтах — для сравнения до/после. Без with_data считается
+# только JSON-часть, которую Streamlit отправляет отдельно от Arrow-данных
+def spec_bytes(chart, with_data=False):
+    spec = chart.to_dict()
+    if not with_data:
+        spec.pop("datasets", None)
+    return len(json.dumps(spec, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+# Ряд поверх своей базовой линии (kpi_analytics): полоса P5–P95, пунктир EWMA и точки
+# аномалий. Без anomalies аномалии берутся из того же кадра по флагу — данные в слоях
+# общие; отдельный кадр нужен, когда линия прорежена, а аномалии взяты из полного ряда.
+# y — параметры оси значений (title, scale), общие для всех слоёв
+def baseline_chart(df, x, column, color, anomalies=None, point=False, **y):
+    low, high, ewma, flag = (kpi_analytics.column_name(column, suffix) for suffix in
+                             (kpi_analytics.LOW, kpi_analytics.HIGH, kpi_analytics.EWMA, kpi_analytics.ANOMALY))
+    base = alt.Chart(df).encode(x=x)
+    band = base.mark_area(color=color, opacity=0.15).encode(y=alt.Y(f"{low}:Q", **y), y2=f"{high}:Q")
+    line = base.mark_line(color=color, point=point).encode(y=alt.Y(f"{column}:Q", **y), tooltip=[x.shorthand, column, ewma])
+    smooth = base.mark_line(color="#555555", strokeDash=[4, 3]).encode(y=alt.Y(f"{ewma}:Q", **y))
+    marks = base.transform_filter(alt.datum[flag]) if anomalies is None else alt.Chart(anomalies).encode(x=x)
+    points = marks.mark_point(color="#DC143C", filled=True, size=80).encode(
+        y=alt.Y(f"{column}:Q", **y),
+        tooltip=[x.shorthand, column]
+    )
+    return alt.layer(band, line, smooth, points)
+
+
+# Графики проектного дашборда app_final_gantt.py; те же графики выгружает report_export.py.
+# VOC и достоверность — только если по проекту есть замеры
+def project_charts(project_subset, voc_subset, accuracy_subset, timeline_subset):
+    result = {
+        "progress": alt.Chart(project_subset).mark_line(point=True, color="#007BFF").encode(
+            x=alt.X("Квартал:O"),
+            y=alt.Y("Прогресс, %:Q"),
+            tooltip=["Квартал", "Прогресс, %"]
+        ).properties(height=250, title="Динамика прогресса проекта"),
+        "csat": alt.Chart(project_subset).mark_line(point=True, color="#00CC88").encode(
+            x=alt.X("Квартал:O"),
+            y=alt.Y("CSAT, %:Q"),
+            tooltip=["Квартал", "CSAT, %"]
+        ).properties(height=250, title="Удовлетворённость (CSAT)"),
+        "delay": alt.Chart(project_subset).mark_bar(color="#FF9966").encode(
+            x=alt.X("Квартал:O"),
+            y=alt.Y("Отклонение от срока, дней:Q"),
+            tooltip=["Квартал", "Отклонение от срока, дней"]
+        ).properties(height=250, title="Отклонение от срока (в днях)"),
+    }
+    if not voc_subset.empty:
+        result["voc"] = baseline_chart(
+            voc_subset, alt.X("Дата:T", title="Месяц"), "VOC, %", "#6A5ACD", point=True,
+            title="VOC (%)", scale=alt.Scale(domain=[70, 100])  # Установка границ по y
+        ).properties(height=250, title="📣 Оценка голоса клиента (VOC)") \
+         .configure_axis(labelFontSize=12, titleFontSize=14)
+    if not accuracy_subset.empty:
+        result["accuracy"] = baseline_chart(
+            accuracy_subset, alt.X("Дата:T", title="Дата замера"), "Достоверность, %", "#DC143C", point=True,
+            title="Достоверность (%)", scale=alt.Scale(domain=[85, 100])
+        ).properties(height=250, title="✅ Точность ответов (достоверность)") \
+         .configure_axis(labelFontSize=12, titleFontSize=14)
+    result["timeline"] = alt.Chart(timeline_subset).mark_bar().encode(
+        x='Начало:T',
+        x2='Окончание:T',
+        y=alt.Y('Проект:N', sort=None),
+        color=alt.value("#007BFF")
+    ).properties(height=100)
+    return result
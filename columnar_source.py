@@ -0,0 +1,194 @@
+import functools
+import os
+
+import pandas as pd
+
+# -------------------------------
+# Колоночный источник данных (Parquet / Arrow IPC)
+# -------------------------------
+# Датасеты лежат в DASHBOARD_DATA_DIR/<имя>/ в виде партиционированного
+# (hive-style, например Проект=.../date=...) набора Parquet или Arrow-файлов.
+# Чтение идёт через pyarrow.dataset: читаются только запрошенные колонки,
+# фильтры по проекту/команде/датам проталкиваются до уровня партиций и
+# row group'ов, локальные файлы открываются через mmap.
+# Если каталог не задан или датасета нет — используется mock-фабрика
+# из вызывающего кода, к ней применяются те же проекция и фильтры.
+
+DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR")
+# Счётчик версии данных: увеличивается сборщиком (ingestion.py) после каждой записи
+VERSION_FILE = "_version"
+
+# Имена колонок, по которым фильтруется каждый датасет
+DATASETS = {
+    "kpi_daily": {"date": "date"},
+    "project_metrics": {"project": "Проект"},
+    "voc": {"project": "Проект", "date": "Дата"},
+    "accuracy": {"project": "Проект", "date": "Дата"},
+    "project_timeline": {"project": "Проект", "date": "Начало"},
+    "employees": {"team": "Команда"},
+    "kpi_teams": {"team": "Команда"},
+    "spending": {},
+}
+
+# Имя датасета -> mock-фабрика для движков, которые читают датасет без вызывающего
+# кода (query_engine); регистрируют страницы и data_layer, импорт движков не нужен
+FALLBACKS = {}
+
+
+def register_fallback(name, factory):
+    FALLBACKS.setdefault(name, factory)
+
+
+def dataset_path(name):
+    if not DATA_DIR:
+        return None
+    path = os.path.join(DATA_DIR, name)
+    return path if os.path.exists(path) else None
+
+
+def has_dataset(name):
+    return dataset_path(name) is not None
+
+
+def current_version(data_dir=None):
+    data_dir = data_dir or DATA_DIR
+    if not data_dir:
+        return None
+    try:
+        with open(os.path.join(data_dir, VERSION_FILE), encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return None
+
+
+# Версия данных для ключей кэшей: явная из окружения, иначе счётчик хранилища,
+# который двигает ingestion.py; без хранилища — версия mock-кадров
+def source_version():
+    version = os.environ.get("DASHBOARD_DATA_VERSION")
+    if version:
+        return version
+    stored = current_version()
+    return f"store-{stored}" if stored is not None else "mock-1"
+
+
+def bump_version(data_dir=None):
+    data_dir = data_dir or DATA_DIR
+    version = (current_version(data_dir) or 0) + 1
+    tmp_path = os.path.join(data_dir, VERSION_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(version))
+    os.replace(tmp_path, os.path.join(data_dir, VERSION_FILE))
+    return version
+
+
+def _detect_format(path):
+    if os.path.isfile(path):
+        return "ipc" if path.endswith((".arrow", ".feather", ".ipc")) else "parquet"
+    for _, _, files in os.walk(path):
+        for file in files:
+            if file.endswith((".arrow", ".feather", ".ipc")):
+                return "ipc"
+            if file.endswith(".parquet"):
+                return "parquet"
+    return "parquet"
+
+
+# Открытый датасет (метаданные, список фрагментов) переиспользуется между вызовами;
+# версия в ключе заставляет перечитать список файлов после новой записи
+@functools.lru_cache(maxsize=32)
+def open_dataset(path, version=None):
+    import pyarrow.dataset as ds
+    import pyarrow.fs as fs
+
+    return ds.dataset(
+        path,
+        format=_detect_format(path),
+        partitioning="hive",
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def _scalar(value, arrow_type):
+    import pyarrow as pa
+
+    if pa.types.is_date(arrow_type):
+        return pa.scalar(pd.Timestamp(value).date(), type=arrow_type)
+    if pa.types.is_timestamp(arrow_type):
+        # pandas Timestamp pyarrow принимает напрямую, с наносекундами и без предупреждений
+        return pa.scalar(pd.Timestamp(value), type=arrow_type)
+    return pa.scalar(value, type=arrow_type)
+
+
+def _values(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _arrow_filter(dataset, spec, project, team, date_from, date_to):
+    import pyarrow.dataset as ds
+
+    expr = None
+    for key, value in (("project", project), ("team", team)):
+        if value is None or key not in spec:
+            continue
+        cond = ds.field(spec[key]).isin(_values(value))
+        expr = cond if expr is None else expr & cond
+    if "date" in spec:
+        date_type = dataset.schema.field(spec["date"]).type
+        if date_from is not None:
+            cond = ds.field(spec["date"]) >= _scalar(date_from, date_type)
+            expr = cond if expr is None else expr & cond
+        if date_to is not None:
+            cond = ds.field(spec["date"]) <= _scalar(date_to, date_type)
+            expr = cond if expr is None else expr & cond
+    return expr
+
+
+def _pandas_filter(df, spec, project, team, date_from, date_to):
+    mask = pd.Series(True, index=df.index)
+    for key, value in (("project", project), ("team", team)):
+        if value is not None and key in spec:
+            mask &= df[spec[key]].isin(_values(value))
+    if "date" in spec:
+        dates = pd.to_datetime(df[spec["date"]])
+        if date_from is not None:
+            mask &= dates >= pd.Timestamp(date_from)
+        if date_to is not None:
+            mask &= dates <= pd.Timestamp(date_to)
+    return df if mask.all() else df[mask]
+
+
+def read_arrow(name, columns=None, project=None, team=None, date_from=None, date_to=None):
+    dataset = open_dataset(dataset_path(name), current_version())
+    expr = _arrow_filter(dataset, DATASETS.get(name, {}), project, team, date_from, date_to)
+    return dataset.to_table(columns=columns, filter=expr)
+
+
+# Границы дат датасета: читается только колонка дат
+def date_bounds(name, fallback):
+    column = DATASETS[name]["date"]
+    if has_dataset(name):
+        import pyarrow.compute as pc
+
+        bounds = pc.min_max(read_arrow(name, columns=[column])[column]).as_py()
+        return pd.Timestamp(bounds["min"]), pd.Timestamp(bounds["max"])
+    dates = pd.to_datetime(fallback()[column])
+    return dates.min(), dates.max()
+
+
+# Колонки датасета (схема хранилища или mock-кадра) — для проекций с необязательными колонками
+def columns(name, fallback):
+    if has_dataset(name):
+        return open_dataset(dataset_path(name), current_version()).schema.names
+    return list(fallback().columns)
+
+
+# Основная точка входа для страниц: проекция колонок + фильтры, mock как запасной вариант.
+# Типы колонок приводятся по реестру schema_registry
+def load(name, fallback, columns=None, project=None, team=None, date_from=None, date_to=None):
+    import schema_registry
+
+    if has_dataset(name):
+        table = read_arrow(name, columns, project, team, date_from, date_to)
+        return schema_registry.to_pandas(table, name)
+    df = _pandas_filter(fallback(), DATASETS.get(name, {}), project, team, date_from, date_to)
+    return schema_registry.enforce(df[columns] if columns is not None else df, name)
@@ -0,0 +1,113 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Иерархический куб расходов (MECE-дерево)
+# -------------------------------
+# Факты хранятся в длинном формате: Категория → Подкатегория → Команда → Месяц
+# и Год. Агрегаты по каждому префиксу иерархии считаются один раз при
+# построении куба и хранятся компактно (категориальные измерения, int64/float32
+# значения). Drill-down, итоги и год-к-году берутся из готовых агрегатов.
+
+LEVELS = ("Категория", "Подкатегория", "Команда", "Месяц")
+PERIOD = "Год"
+MEASURE = "Значение"
+COMMON_TEAM = "Общие"
+
+# "ФОТ — NLP (6 чел)" -> категория "ФОТ", подкатегория "NLP", команда "NLP"
+_LABEL = re.compile(r"^(?P<category>.+?)\s+—\s+(?P<sub>.+?)(?:\s+\((?P<note>[^)]*)\))?$")
+TEAMS = ("NLP", "MLOps", "DevOps", "PM")
+
+
+def parse_label(label):
+    match = _LABEL.match(label)
+    if not match:
+        return label, label, COMMON_TEAM
+    category, sub = match.group("category"), match.group("sub")
+    return category, sub, sub if sub in TEAMS else COMMON_TEAM
+
+
+# Плоская таблица "Категория × годы" -> факты по месяцам. Годовая сумма
+# раскладывается по месяцам целыми частями, итог года сохраняется точно.
+def facts_from_spending(spending, label_column="Категория"):
+    years = [column for column in spending.columns if column != label_column]
+    parsed = pd.DataFrame([parse_label(label) for label in spending[label_column]],
+                          columns=["Категория", "Подкатегория", "Команда"])
+    wide = pd.concat([parsed, spending[years].reset_index(drop=True)], axis=1)
+    long = wide.melt(id_vars=["Категория", "Подкатегория", "Команда"], var_name=PERIOD, value_name=MEASURE)
+    values = long[MEASURE].to_numpy(dtype=np.int64)
+    months = np.arange(1, 13)
+    base, remainder = np.divmod(values, 12)
+    monthly = base[:, None] + (months[None, :] <= remainder[:, None])
+    facts = long.drop(columns=MEASURE).loc[np.repeat(long.index, 12)].reset_index(drop=True)
+    facts["Месяц"] = np.tile(months, len(long))
+    facts[PERIOD] = facts[PERIOD].astype(int)
+    facts[MEASURE] = monthly.ravel()
+    return facts
+
+
+def _compact(facts, dims, period, measure):
+    facts = facts.copy()
+    for dim in dims:
+        if dim != "Месяц":
+            facts[dim] = facts[dim].astype("category")
+    if period is not None:
+        facts[period] = facts[period].astype(np.int16)
+    if "Месяц" in facts.columns:
+        facts["Месяц"] = facts["Месяц"].astype(np.int8)
+    if pd.api.types.is_integer_dtype(facts[measure]):
+        facts[measure] = facts[measure].astype(np.int64)
+    else:
+        facts[measure] = facts[measure].astype(np.float32)
+    return facts
+
+
+class CostCube:
+    def __init__(self, facts, dims=LEVELS, period=PERIOD, measure=MEASURE):
+        self.dims = tuple(dims)
+        self.period = period if period in facts.columns else None
+        self.measure = measure
+        facts = _compact(facts, self.dims, self.period, measure)
+        self.rollups = {}
+        for depth in range(len(self.dims) + 1):
+            keys = list(self.dims[:depth])
+            if not keys:
+                agg = facts.groupby(self.period)[measure].sum().to_frame().T if self.period \
+                    else pd.DataFrame({measure: [facts[measure].sum()]})
+                agg = agg.reset_index(drop=True)
+            elif self.period:
+                agg = facts.groupby(keys + [self.period], observed=True, sort=False)[measure].sum()
+                agg = agg.unstack(self.period, fill_value=0)
+            else:
+                agg = facts.groupby(keys, observed=True, sort=False)[measure].sum().to_frame()
+            agg.columns = [str(column) for column in agg.columns]
+            self.rollups[depth] = agg
+
+    # Агрегаты уровня level, отфильтрованные по пути сверху: level("Подкатегория", Категория="ФОТ")
+    def level(self, level, **path):
+        depth = self.dims.index(level) + 1
+        agg = self.rollups[depth]
+        for dim, value in path.items():
+            agg = agg[agg.index.get_level_values(dim) == value]
+        return agg
+
+    def total(self, **path):
+        if not path:
+            return self.rollups[0].iloc[0]
+        deepest = max(self.dims.index(dim) for dim in path)
+        return self.level(self.dims[deepest], **path).sum()
+
+    def children(self, **path):
+        depth = len(path)
+        return self.level(self.dims[depth], **path).droplevel(list(range(depth))) if depth else self.level(self.dims[0])
+
+
+# Год к году по двум колонкам агрегата
+def yoy(agg, year_from, year_to):
+    year_from, year_to = str(year_from), str(year_to)
+    result = agg[[year_from, year_to]].copy()
+    result["Δ, млн ₽"] = result[year_to] - result[year_from]
+    result["Δ, %"] = (result["Δ, млн ₽"] / result[year_from].replace(0, np.nan) * 100).round(1)
+    return result
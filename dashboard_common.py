@@ -0,0 +1,198 @@
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+
+# -------------------------------
+# Общий модуль дашбордов: ленивые импорты, справочные данные, замер старта
+# -------------------------------
+# Тяжёлые модули (altair, pyarrow-зависимые движки и т.п.) подключаются через
+# lazy(): настоящий импорт происходит при первом обращении к атрибуту, так что
+# страница не платит за то, чем не пользуется. Статические справочные кадры
+# страниц собираются в памяти один раз на процесс и общие для всех сессий
+# (кадры крошечные — сборка дешевле, чем чтение их с диска).
+# Время старта (ленивые импорты, первая отрисовка) копится в STARTUP и, если
+# задан DASHBOARD_STARTUP_LOG, пишется JSON-строкой в файл. Первая отрисовка
+# отсчитывается от запуска процесса, а не от импорта этого модуля: в холодный
+# старт входят запуск интерпретатора, импорт streamlit и сервера.
+
+STARTUP_LOG = os.environ.get("DASHBOARD_STARTUP_LOG")
+
+
+# Время запуска процесса (Unix time): psutil, если установлен, иначе /proc на Linux,
+# иначе — момент импорта модуля
+def _process_started():
+    try:
+        import psutil
+
+        return psutil.Process().create_time()
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            # Имя процесса в скобках может содержать пробелы — поля считаются после ")"
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+PROCESS_STARTED = _process_started()
+
+STARTUP = {}
+_startup_lock = threading.Lock()
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            # Сессии Streamlit работают в разных потоках — импорт под блокировкой
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    STARTUP[f"import:{self.__name__}"] = _ms(time.perf_counter() - start)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy(name):
+    return sys.modules.get(name) or LazyModule(name)
+
+
+pd = lazy("pandas")
+alt = lazy("altair")
+
+TEAMS = ["NLP", "MLOps", "DevOps", "PM"]
+YEARS = [2025, 2026, 2027, 2028]
+
+# -- Справочные данные страниц (демонстрационные) --
+REFERENCE = {
+    "app1": {
+        "pnl": {"Показатель": ["Общие доходы", "Издержки (R&D, ФОТ, ИТ)", "Прибыль"], "Сумма, млн руб": [120, 80, 40]},
+        "llm_effect": {"Метрика": ["Доп. доход от LLM", "Сэкономлено"], "Млн руб": [15, 12]},
+        "expenses": {"Категория": ["R&D", "ФОТ", "Инфраструктура"], "Млн руб": [20, 50, 10]},
+        "teams": {"Команда": TEAMS, "План (шт)": [100, 80, 90, 50], "Факт (шт)": [95, 85, 80, 60]},
+        "employees": {
+            "NLP": {"Сотрудник": ["Иванов", "Петров", "Сидоров"], "Выполнено": [30, 25, 40]},
+            "MLOps": {"Сотрудник": ["Кузнецов", "Новикова"], "Выполнено": [50, 35]},
+            "DevOps": {"Сотрудник": ["Федоров", "Орлов", "Морозова"], "Выполнено": [20, 15, 30]},
+            "PM": {"Сотрудник": ["Семенов", "Зайцева"], "Выполнено": [10, 12]},
+        },
+    },
+    "app2": {
+        "pnl": {
+            "Год": YEARS,
+            "Выручка банка, млн ₽": [600_000, 660_000, 730_000, 810_000],
+            "AI-выручка, млн ₽": [7_200, 13_860, 25_550, 40_500],
+        },
+        "economy_effect": {
+            "Год": YEARS,
+            "Экономия затрат, млн ₽": [1_200, 2_400, 4_000, 6_000],
+            "Доп. доход от LLM, млн ₽": [1_500, 3_000, 5_500, 9_000],
+        },
+        "spending": {
+            "Категория": ["R&D", "Фонд оплаты труда", "Инфраструктура", "Управление проектами"],
+            "2025": [2_000, 3_500, 1_000, 500],
+            "2026": [2_400, 3_800, 1_200, 600],
+        },
+        "kpi": {
+            "Команда": TEAMS,
+            "Показатель": ["Precision", "CI/CD %", "Аптайм %", "Кол-во MVP"],
+            "План": [0.92, 0.97, 99.9, 8],
+            "Факт": [0.89, 0.95, 99.5, 6],
+        },
+        "employees": {
+            "NLP": {"Сотрудник": ["Иванов", "Петров", "Сидоров"], "Закрыто задач": [25, 30, 28]},
+            "MLOps": {"Сотрудник": ["Новикова", "Фролов"], "Закрыто задач": [40, 35]},
+            "DevOps": {"Сотрудник": ["Орлов", "Морозов", "Зайцева"], "Закрыто задач": [20, 18, 25]},
+            "PM": {"Сотрудник": ["Семенов", "Григорьева"], "Закрыто задач": [10, 12]},
+        },
+    },
+    "app3": {
+        "pnl": {
+            "Год": YEARS,
+            "Общая прибыль, млн ₽": [29_146, 35_000, 42_000, 49_000],
+            "Прибыль, связанная с ИИ, млн ₽": [1_200, 2_400, 4_800, 7_200],
+        },
+        "economy_effect": {
+            "Год": YEARS,
+            "Экономия от ИИ, млн ₽": [800, 1_500, 2_500, 4_000],
+            "Доп. доход от ИИ, млн ₽": [400, 900, 2_300, 3_200],
+        },
+        "spending": {
+            "Категория": ["ФОТ", "R&D", "Инфраструктура (облако, GPU)", "PM / Support / QA"],
+            "2025": [3_200, 2_000, 1_200, 600],
+            "2026": [3_500, 2_300, 1_400, 700],
+        },
+        "kpi": {
+            "Команда": TEAMS,
+            "Показатель": ["Precision классификации", "% CI/CD-деплоев", "Аптайм сервисов", "Кол-во MVP за квартал"],
+            "План": [0.92, 0.97, 99.9, 8],
+            "Факт": [0.89, 0.95, 99.5, 6],
+        },
+        "employees": {
+            "NLP": {"Сотрудник": ["Иванов", "Петров", "Сидоров"], "Precision": [0.91, 0.93, 0.88]},
+            "MLOps": {"Сотрудник": ["Новикова", "Фролов"], "% успешных CI/CD": [96, 94]},
+            "DevOps": {"Сотрудник": ["Орлов", "Морозов", "Зайцева"], "Аптайм сервисов, %": [99.4, 99.7, 99.5]},
+            "PM": {"Сотрудник": ["Семенов", "Григорьева"], "MVP за квартал": [3, 4]},
+        },
+    },
+}
+
+# Справочные кадры страницы собираются при первом обращении, один раз на процесс:
+# общие для всех сессий, не изменять на месте
+@functools.lru_cache(maxsize=None)
+def reference(page):
+    return {
+        name: {team: pd.DataFrame(rows) for team, rows in table.items()} if name == "employees" else pd.DataFrame(table)
+        for name, table in REFERENCE[page].items()
+    }
+
+
+# Год × несколько показателей в длинном формате: столбцы или линия с точками
+def year_chart(df, value_columns, as_, mark="bar"):
+    import charts
+
+    var_name, value_name = as_
+    chart = charts.fold_chart(df, "Год", value_columns, as_=as_)
+    chart = chart.mark_line(point=True) if mark == "line" else chart.mark_bar()
+    return chart.encode(
+        x=alt.X("Год:O", title="Год"),
+        y=alt.Y(f"{value_name}:Q", title="млн ₽"),
+        color=f"{var_name}:N"
+    ).properties(width=500, height=300)
+
+
+# Вызывается в конце страницы: первая отрисовка процесса фиксирует время холодного старта
+def page_ready(page):
+    with _startup_lock:
+        if "first_render_ms" in STARTUP:
+            return
+        STARTUP["page"] = page
+        STARTUP["first_render_ms"] = _ms(time.time() - PROCESS_STARTED)
+    if STARTUP_LOG:
+        import json
+
+        with open(STARTUP_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), "pid": os.getpid(), **STARTUP}, ensure_ascii=False) + "\n")
@@ -0,0 +1,357 @@
+import datetime
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import columnar_source as cs
+import dashboard_common as common
+import instrumentation as instr
+import kpi_analytics
+import kpi_engine
+import schema_registry
+
+# Движки подключаются при первом обращении: app.py берёт отсюда только версию
+# источника и не должен платить за импорт altair, кубов и индексов
+capacity = common.lazy("capacity")
+cost_cube = common.lazy("cost_cube")
+forecast = common.lazy("forecast")
+paged_table = common.lazy("paged_table")
+project_index = common.lazy("project_index")
+query_engine = common.lazy("query_engine")
+timeline = common.lazy("timeline")
+
+# -------------------------------
+# Слой доступа к данным для app_final_gantt.py
+# -------------------------------
+# Все загрузчики кэшируются через st.cache_data: ключ кэша — аргументы функции,
+# поэтому каждый загрузчик принимает версию источника. Смена версии (новая
+# выгрузка данных) автоматически даёт промах кэша, старые записи вытесняются
+# по TTL и по лимиту max_entries.
+# Данные читаются из колоночного хранилища (columnar_source), mock-кадры ниже
+# используются, когда хранилище не подключено.
+
+CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 600))
+CACHE_MAX_ENTRIES = int(os.environ.get("DASHBOARD_CACHE_MAX_ENTRIES", 64))
+
+YEARS = [2025, 2026, 2027, 2028]
+TEAMS = ["NLP", "MLOps", "DevOps", "PM"]
+
+
+# Явная версия из окружения, иначе счётчик хранилища, который двигает ingestion.py
+def get_source_version():
+    return cs.source_version()
+
+
+# Таймер внутри кэша: в метрики попадают только реальные загрузки (промахи)
+def cached(func):
+    return st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)(
+        instr.timed(f"load.{func.__name__}")(func)
+    )
+
+
+# Кадры датасетов: один объект на процесс вместо распакованной копии на каждую сессию,
+# как у st.cache_data. Кадр неизменяемый: вызывающий код не меняет его на месте
+def shared(func):
+    return st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)(
+        instr.timed(f"load.{func.__name__}")(func)
+    )
+
+
+# -- Экономика ИИ --
+@cached
+def load_expense_base(version):
+    return pd.DataFrame({
+        "Год": YEARS,
+        "Расходы банка, млн ₽": [450_000, 470_000, 495_000, 520_000],
+        "Экономия от ИИ, млн ₽": [800, 1_500, 2_500, 4_000]
+    })
+
+
+# Прогноз по всей сетке слайдера считается один раз на версию данных
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_forecast_grid(version):
+    return forecast.ScenarioGrid(load_expense_base(version)["Экономия от ИИ, млн ₽"].to_numpy())
+
+
+# Зависит только от слайдера growth_rate: значение — строка готовой матрицы прогноза
+@cached
+def load_expense_data(growth_rate, version):
+    expense_data = load_expense_base(version)
+    expense_data["Экономия от ИИ, млн ₽"] = load_forecast_grid(version).row(growth_rate).astype(int)
+    expense_data["Расходы без ИИ, млн ₽"] = expense_data["Расходы банка, млн ₽"] - expense_data["Экономия от ИИ, млн ₽"]
+    expense_data["Экономия от ИИ, %"] = (expense_data["Экономия от ИИ, млн ₽"] / expense_data["Расходы банка, млн ₽"] * 100).round(2)
+    return expense_data
+
+
+# Полоса P5–P95 экономии по сценариям Монте-Карло
+@cached
+def load_savings_band(mean_rate, std_rate, version, n_scenarios=10_000):
+    expense_base = load_expense_base(version)
+    samples = forecast.monte_carlo(expense_base["Экономия от ИИ, млн ₽"].to_numpy(), n_scenarios, mean_rate, std_rate)
+    p5, p50, p95 = forecast.savings_band(samples)
+    return pd.DataFrame({"Год": expense_base["Год"], "P5": p5.round(), "P50": p50.round(), "P95": p95.round()})
+
+
+@cached
+def load_benchmark(version):
+    return pd.DataFrame({
+        "Банк": ["Альфа-Банк", "Тинькофф", "Сбер", "ВТБ"],
+        "Экономия от ИИ, % от расходов": [6.9, 5.2, 8.5, 4.4]
+    })
+
+
+# Эффект от ИИ по направлениям: итог берётся из агрегата куба, а не суммой по срезу строк
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_effect_cube(version):
+    return cost_cube.CostCube(pd.DataFrame({
+        "Цвет": ["Инвестиции", "Экономия", "Экономия", "Экономия", "Экономия"],
+        "Этап": [
+            "Инвестиции в ИИ (CapEx)",
+            "Экономия: Контактный центр",
+            "Экономия: KYC/AML",
+            "Экономия: Бэк-офис",
+            "Экономия: Обработка транзакций"
+        ],
+        "Значение": [-6000, 96, 420, 1800, 350]
+    }), dims=("Цвет", "Этап"))
+
+
+@cached
+def load_waterfall(version):
+    effect_cube = load_effect_cube(version)
+    stages = effect_cube.level("Этап").reset_index()
+    total = pd.DataFrame({"Цвет": ["Итог"], "Этап": ["Совокупный эффект"], "Значение": [effect_cube.total()["Значение"]]})
+    return pd.concat([stages, total], ignore_index=True)[["Этап", "Значение", "Цвет"]]
+
+
+# -- Расходы (MECE) --
+def _mock_spending():
+    return pd.DataFrame({
+        "Категория": [
+            "ФОТ — NLP (6 чел)", "ФОТ — MLOps (4 чел)", "ФОТ — DevOps (3 чел)", "ФОТ — PM (2 чел)",
+            "R&D — эксперименты", "R&D — лицензии LLM", "Инфраструктура — GPU", "Инфраструктура — облако", "PM / Support / QA"
+        ],
+        "2025": [1_200, 900, 600, 300, 600, 400, 700, 500, 400],
+        "2026": [1_400, 1_000, 650, 320, 700, 450, 750, 550, 450]
+    })
+
+
+@shared
+def load_spending(version):
+    return cs.load("spending", _mock_spending)
+
+
+# Куб расходов Категория → Подкатегория → Команда → Месяц с готовыми агрегатами
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_cost_cube(version):
+    return cost_cube.CostCube(cost_cube.facts_from_spending(load_spending(version)))
+
+
+# -- KPI команд --
+def _mock_kpi():
+    return pd.DataFrame({
+        "Команда": TEAMS,
+        "Показатель": ["Precision классификации", "% CI/CD-деплоев", "Аптайм сервисов", "Кол-во MVP за квартал"],
+        "План": [0.92, 0.97, 99.9, 8],
+        "Факт": [0.89, 0.95, 99.5, 6]
+    })
+
+
+# План/факт с отклонением и RAG-статусом, посчитанными векторно
+@shared
+def load_kpi(version):
+    return schema_registry.enforce(kpi_engine.evaluate(cs.load("kpi_teams", _mock_kpi), emoji=True), "kpi")
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_kpi_table(version):
+    return paged_table.PandasBackend(load_kpi(version))
+
+
+# -- Сотрудники --
+def _mock_employees():
+    employees = {
+        "NLP": pd.DataFrame({
+            "Сотрудник": ["Иванов", "Петров", "Сидоров"],
+            "План задач": [28, 30, 26],
+            "Факт задач": [25, 30, 28]
+        }),
+        "MLOps": pd.DataFrame({
+            "Сотрудник": ["Новикова", "Фролов"],
+            "План задач": [38, 36],
+            "Факт задач": [40, 35]
+        }),
+        "DevOps": pd.DataFrame({
+            "Сотрудник": ["Орлов", "Морозов", "Зайцева"],
+            "План задач": [20, 20, 23],
+            "Факт задач": [20, 18, 25]
+        }),
+        "PM": pd.DataFrame({
+            "Сотрудник": ["Семенов", "Григорьева"],
+            "План задач": [12, 10],
+            "Факт задач": [10, 12]
+        })
+    }
+    return pd.concat(employees, names=["Команда"]).reset_index(level=0).reset_index(drop=True)
+
+
+EMPLOYEE_COLUMNS = ["Команда", "Сотрудник", "План задач", "Факт задач"]
+
+
+# Все команды за один векторный проход по длинному кадру: исполнение считается
+# один раз, кадр сортируется по (команда, исполнение ↓), и каждая команда
+# становится непрерывным диапазоном строк. Кадр общий для всех сессий и не
+# изменяется после построения — наружу отдаются только срезы.
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_employee_frame(version):
+    df = cs.load("employees", _mock_employees, columns=EMPLOYEE_COLUMNS)[EMPLOYEE_COLUMNS]
+    df = df.assign(**{"Исполнение, %": (df["Факт задач"] / df["План задач"] * 100).round(1)})
+    df = df.sort_values(["Команда", "Исполнение, %"], ascending=[True, False], kind="stable")
+    return schema_registry.enforce(df.reset_index(drop=True), "employee_performance")
+
+
+# Команда -> готовый отсортированный вид; границы команд — места смены значения в
+# отсортированной колонке (порядок категорий может быть любым), срезы iloc не
+# копируют данные (copy-on-write)
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_employee_views(version):
+    df = load_employee_frame(version)
+    column = df["Команда"].to_numpy(dtype=str)
+    starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]]) if len(df) else np.array([], dtype=int)
+    teams = column[starts]
+    stops = np.append(starts[1:], len(df))
+    return {
+        team: df.iloc[start:stop].drop(columns="Команда").reset_index(drop=True)
+        for team, start, stop in zip(teams.tolist(), starts, stops)
+    }
+
+
+# Выбор команды — поиск в словаре готовых видов, без пересчёта и сортировки
+def load_employee_performance(team, version):
+    return load_employee_views(version).get(team, load_employee_frame(version).iloc[:0].drop(columns="Команда"))
+
+
+# Таблица по всем командам для paged_table. При подключённом хранилище
+# фильтр, сортировку и LIMIT/OFFSET выполняет общий DuckDB-движок прямо по Parquet.
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_employee_table(version):
+    if cs.has_dataset("employees") and importlib.util.find_spec("duckdb") is not None:
+        return paged_table.DuckDBBackend("employees", {"Исполнение, %": 'round("Факт задач" / "План задач" * 100, 1)'},
+                                         connection=query_engine.engine(version).connection)
+    return paged_table.PandasBackend(load_employee_frame(version))
+
+
+# -- Проекты --
+def _mock_timeline():
+    return pd.DataFrame({
+        "Проект": ["Запуск чат-бота", "Модель оценки риска", "Интеграция CI/CD", "LLM в КЦ", "Облачная миграция"],
+        "Начало": [datetime.date(2025, 1, 15), datetime.date(2025, 2, 10), datetime.date(2025, 3, 1),
+                   datetime.date(2025, 3, 20), datetime.date(2025, 4, 5)],
+        "Окончание": [datetime.date(2025, 2, 28), datetime.date(2025, 4, 1), datetime.date(2025, 4, 10),
+                      datetime.date(2025, 6, 1), datetime.date(2025, 6, 30)]
+    })
+
+
+# Команда и статус — только если они есть в выгрузке: без них нет фильтров и загрузки по командам
+@shared
+def load_gantt(version):
+    available = cs.columns("project_timeline", _mock_timeline)
+    columns = ["Проект", "Начало", "Окончание"] + [column for column in ("Команда", "Статус") if column in available]
+    return cs.load("project_timeline", _mock_timeline, columns=columns)
+
+
+# Отсортированный индекс план-графика для запросов по окну дат
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_timeline_index(version):
+    return timeline.TimelineIndex(load_gantt(version))
+
+
+# Прогноз окончания проектов с учётом последнего отклонения от срока; индекс —
+# позиции строк в индексе план-графика, как у видимого окна timeline_index.query()
+@shared
+def load_slippage(version):
+    return capacity.slippage(load_timeline_index(version).frame, cs.load("project_metrics", _mock_project_data))
+
+
+def _mock_project_data():
+    return pd.DataFrame({
+        "Проект": ["Запуск чат-бота"] * 4 + ["Модель оценки риска"] * 4 + ["Интеграция CI/CD"] * 4 + ["LLM в КЦ"] * 4 + ["Облачная миграция"] * 4,
+        "Квартал": ["Q1", "Q2", "Q3", "Q4"] * 5,
+        "Прогресс, %": [20, 50, 80, 100, 10, 35, 60, 100, 25, 55, 85, 100, 15, 40, 70, 95, 5, 30, 60, 100],
+        "CSAT, %": [87, 89, 90, 91, 82, 85, 88, 90, 80, 82, 85, 87, 88, 89, 91, 93, 83, 84, 86, 88],
+        "Отклонение от срока, дней": [0, 1, -2, -3, 5, 3, 0, -1, 2, 0, -2, -4, 1, 0, -1, -2, 7, 5, 1, 0]
+    })
+
+
+def _mock_voc():
+    return pd.DataFrame({
+        "Проект": ["Запуск чат-бота"] * 3,
+        "Дата": pd.to_datetime(["2025-01-31", "2025-02-28", "2025-03-31"]),
+        "VOC, %": [72, 75, 78]
+    })
+
+
+def _mock_accuracy():
+    return pd.DataFrame({
+        "Проект": ["Запуск чат-бота"] * 6,
+        "Дата": pd.to_datetime(["2025-03-01", "2025-03-08", "2025-03-15", "2025-03-22", "2025-03-29", "2025-04-05"]),
+        "Достоверность, %": [87, 88, 90, 91, 92, 91]
+    })
+
+
+# Базовая линия замеров (EWMA, полоса P5–P95, z-score и аномалии) по всем проектам
+# одним проходом groupby-rolling, до разбиения индекса на проекты
+def _with_baseline(df, column):
+    return kpi_analytics.grouped_rolling(df.sort_values("Дата", kind="stable", ignore_index=True), "Проект", column)
+
+
+# Индекс по проектам: строится один раз на версию данных и общий для всех сессий
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_project_index(version):
+    return project_index.ProjectIndex({
+        "metrics": cs.load("project_metrics", _mock_project_data),
+        "voc": _with_baseline(cs.load("voc", _mock_voc), "VOC, %"),
+        "accuracy": _with_baseline(cs.load("accuracy", _mock_accuracy), "Достоверность, %"),
+        "timeline": cs.load("project_timeline", _mock_timeline, columns=["Проект", "Начало", "Окончание"]),
+    })
+
+
+def list_projects(version):
+    return load_project_index(version).projects
+
+
+# Срез по выбранному проекту — поиск в словаре, без сканирования кадров
+def load_project_slice(project, version):
+    return load_project_index(version).slice(project, ("metrics", "voc", "accuracy", "timeline"))
+
+
+# -- Произвольные срезы (query_engine) --
+PROJECT_METRICS = ["Прогресс, %", "CSAT, %", "Отклонение от срока, дней"]
+
+
+# Агрегат метрики по кварталам по всему портфелю; порог отсекает проекты-кварталы ниже него.
+# Кэш — в query_engine: Arrow-таблица общая для сессий и уходит в Altair без копии в pandas
+def load_portfolio_cut(metric, aggregate, threshold, version):
+    return query_engine.aggregate(
+        "project_metrics",
+        {metric: (aggregate, metric), "Проектов": ("count", None)},
+        by=["Квартал"],
+        filters=[(metric, ">=", threshold)],
+        version=version,
+    )
+
+
+# Mock-кадры для движка, когда хранилище не подключено
+for _name, _factory in {
+    "spending": _mock_spending,
+    "kpi_teams": _mock_kpi,
+    "employees": _mock_employees,
+    "project_timeline": _mock_timeline,
+    "project_metrics": _mock_project_data,
+    "voc": _mock_voc,
+    "accuracy": _mock_accuracy,
+}.items():
+    cs.register_fallback(_name, _factory)
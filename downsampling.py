@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Даунсэмплинг временных рядов перед отправкой в браузер
+# -------------------------------
+# Разрешение выбирается по видимому диапазону дат и ширине графика в пикселях:
+# больше ~2 точек на пиксель браузер всё равно не нарисует. При сужении
+# диапазона (zoom) страница заново запрашивает окно и получает более
+# детальный ряд, полная история в браузер не уходит.
+
+POINTS_PER_PX = 2
+DEFAULT_WIDTH_PX = 800
+
+METHODS = {
+    "lttb": "LTTB",
+    "minmax": "Min/Max по корзинам",
+    "resample": "Среднее (resample)",
+}
+
+# Лестница шагов агрегации для resample
+RESAMPLE_RULES = ["1min", "5min", "15min", "30min", "1h", "3h", "6h", "12h", "1D", "7D", "30D"]
+
+
+def target_points(width_px=DEFAULT_WIDTH_PX, points_per_px=POINTS_PER_PX):
+    return max(int(width_px * points_per_px), 3)
+
+
+# Минимальный шаг из лестницы, при котором окно укладывается в target_points
+def choose_rule(date_from, date_to, width_px=DEFAULT_WIDTH_PX):
+    span = pd.Timestamp(date_to) - pd.Timestamp(date_from)
+    step = span / target_points(width_px)
+    for rule in RESAMPLE_RULES:
+        if pd.Timedelta(rule) >= step:
+            return rule
+    return RESAMPLE_RULES[-1]
+
+
+# Largest-Triangle-Three-Buckets: внутри корзины площадь считается векторно
+def lttb(x, y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+# Минимум и максимум в каждой корзине: сохраняет пики латентности
+def minmax(y, n_out):
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = np.asarray(y, dtype=np.float64)
+    padded = padded.reshape(buckets, size)
+    rows = np.arange(buckets) * size
+    idx = np.concatenate([rows + np.nanargmin(padded, axis=1), rows + np.nanargmax(padded, axis=1)])
+    return np.unique(idx[idx < n])
+
+
+def resample(df, x, columns, rule, how="mean"):
+    return df.set_index(x)[columns].resample(rule).agg(how).dropna(how="all").reset_index()
+
+
+# Прорежённый кадр для графика: индексы точек объединяются по всем колонкам,
+# чтобы серии на одном графике (precision/recall) остались согласованными
+def downsample(df, x, columns, width_px=DEFAULT_WIDTH_PX, method="lttb"):
+    n_out = target_points(width_px)
+    if len(df) <= n_out:
+        return df[[x] + columns]
+    if method == "resample":
+        return resample(df, x, columns, choose_rule(df[x].iloc[0], df[x].iloc[-1], width_px))
+    xs = df[x].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    xs = xs - xs[0]
+    per_column = max(n_out // len(columns), 3)
+    parts = []
+    for column in columns:
+        ys = df[column].to_numpy(dtype=np.float64)
+        # Пропуски (метрика есть не у каждой даты после склейки источников) в корзины не
+        # попадают: иначе minmax падает на пустой корзине, а LTTB выбирает NaN-вершину
+        present = np.flatnonzero(~np.isnan(ys))
+        if method == "minmax":
+            parts.append(present[minmax(ys[present], per_column)])
+        else:
+            parts.append(present[lttb(xs[present], ys[present], per_column)])
+    return df[[x] + columns].iloc[np.unique(np.concatenate(parts))].reset_index(drop=True)
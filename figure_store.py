@@ -0,0 +1,101 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+# -------------------------------
+# Общий между процессами кэш сериализованных фигур
+# -------------------------------
+# При запуске под gunicorn каждый воркер — отдельный процесс, поэтому
+# in-process lru_cache не делится. Хранилище кладёт готовый JSON фигуры
+# в общий бэкенд: локальный каталог (атомарная запись через os.replace)
+# или Redis, если задан REDIS_URL, установлен пакет redis и сервер отвечает.
+# Ошибки Redis во время работы не роняют колбэки: кэш просто пропускается.
+# Каталог по умолчанию — в кэше пользователя (XDG_CACHE_HOME), с правами только
+# для владельца: общий /tmp позволил бы чужим файлам подменять фигуры. Ключ фигуры
+# включает версию данных и fingerprint() кода, который её строит, — после новой
+# выгрузки или правки кода старые фигуры не отдаются и после перезапуска.
+
+CACHE_DIR = os.environ.get("DASH_FIGURE_CACHE_DIR", os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "ai-dashboard", "figures"))
+REDIS_URL = os.environ.get("REDIS_URL")
+
+
+# Хэш исходников функций и значений, от которых зависит фигура
+def fingerprint(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update((inspect.getsource(part) if callable(part) else repr(part)).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class FileFigureStore:
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # Кэш необязателен: нет места или прав на каталог — фигура просто не сохраняется
+    def set(self, key, figure):
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(figure if isinstance(figure, str) else json.dumps(figure))
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class RedisFigureStore:
+    def __init__(self, url=REDIS_URL, prefix="ai-dashboard:figure:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._errors = redis.exceptions.RedisError
+
+    # Соединение открывается лениво — проверяем, что сервер отвечает
+    def ping(self):
+        self.client.ping()
+
+    # Redis упал после старта — кэш пропускается, фигура строится заново
+    def get(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except self._errors:
+            return None
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, figure):
+        try:
+            self.client.set(self.prefix + key, figure if isinstance(figure, str) else json.dumps(figure))
+        except self._errors:
+            pass
+
+
+def default_store():
+    if REDIS_URL:
+        try:
+            import redis
+
+            store = RedisFigureStore()
+            store.ping()
+            return store
+        except ImportError:
+            pass
+        except (ValueError, redis.exceptions.RedisError):
+            # Некорректный REDIS_URL или недоступный Redis — каталог на диске
+            pass
+    return FileFigureStore()
@@ -0,0 +1,48 @@
+import numpy as np
+
+# -------------------------------
+# Сценарный прогноз эффекта ИИ
+# -------------------------------
+# Сложный процент base * (1 + g) ** t считается одним broadcast'ом по всей
+# сетке слайдера growth_rate, по всем статьям и годам горизонта. Слайдер
+# дальше просто выбирает строку готовой матрицы.
+
+GROWTH_GRID = np.arange(0, 101, 5)
+
+
+def growth_factors(rates, horizon):
+    rates = np.asarray(rates, dtype=np.float64)
+    return (1 + rates / 100)[..., None] ** np.arange(horizon)
+
+
+# base: (годы,) или (статьи, годы) -> (ставки, годы) или (ставки, статьи, годы)
+def forecast_grid(base, rates=GROWTH_GRID):
+    base = np.asarray(base, dtype=np.float64)
+    factors = growth_factors(rates, base.shape[-1])
+    if base.ndim == 1:
+        return np.round(base * factors)
+    return np.round(base[None, :, :] * factors[:, None, :])
+
+
+class ScenarioGrid:
+    def __init__(self, base, rates=GROWTH_GRID):
+        self.rates = np.asarray(rates)
+        self.values = forecast_grid(base, self.rates)
+        self._rows = {int(rate): i for i, rate in enumerate(self.rates)}
+
+    def row(self, growth_rate):
+        return self.values[self._rows[int(growth_rate)]]
+
+
+# Монте-Карло: темп роста каждого сценария (и года) случаен, все сценарии — одна матрица
+def monte_carlo(base, n_scenarios=10_000, mean_rate=20.0, std_rate=10.0, seed=0):
+    base = np.asarray(base, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rates = rng.normal(mean_rate, std_rate, size=(n_scenarios, base.shape[-1] - 1)) / 100
+    growth = np.concatenate([np.ones((n_scenarios, 1)), np.cumprod(1 + rates, axis=1)], axis=1)
+    return base * (growth if base.ndim == 1 else growth[:, None, :])
+
+
+# Перцентили по годам для полосы неопределённости
+def savings_band(samples, quantiles=(5, 50, 95)):
+    return np.percentile(samples, quantiles, axis=0)
@@ -0,0 +1,13 @@
+import multiprocessing
+import os
+
+# Продакшен-запуск Dash-приложения app1.py:
+#   gunicorn -c gunicorn.conf.py app1:server
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 2))
+# Приложение и прогретый кэш фигур загружаются в мастере до fork
+preload_app = True
+timeout = 30
+keepalive = 5
+accesslog = os.environ.get("GUNICORN_ACCESSLOG")
@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sqlite3
+import time
+import urllib.parse
+import urllib.request
+import uuid
+
+import pandas as pd
+
+import columnar_source as cs
+
+# -------------------------------
+# Фоновый сбор KPI в колоночное хранилище
+# -------------------------------
+# Источники (CI/CD, мониторинг, опросы) опрашиваются на asyncio; число
+# одновременных запросов к каждому источнику ограничено пулом. Строки копятся
+# по датасетам и пишутся пачками в DASHBOARD_DATA_DIR/<датасет>/ как Parquet.
+# После каждой записи увеличивается счётчик версии (columnar_source.bump_version),
+# и страницы Streamlit сбрасывают кэш только когда пришли новые данные.
+#   python ingestion.py --config ingestion.json
+# Формат конфига — см. DEMO_CONFIG.
+
+# Схемы датасетов: отсутствующие у источника колонки пишутся как null
+SCHEMAS = {
+    "kpi_daily": {
+        "date": "timestamp[ns]", "precision": "double", "recall": "double", "latency_ms": "double",
+        "ci_cd_success_rate": "double", "uptime": "double", "nps": "double",
+    },
+    "project_metrics": {
+        "Проект": "string", "Квартал": "string", "Прогресс, %": "double", "CSAT, %": "double",
+        "Отклонение от срока, дней": "double",
+    },
+    "voc": {"Проект": "string", "Дата": "timestamp[ns]", "VOC, %": "double"},
+    "accuracy": {"Проект": "string", "Дата": "timestamp[ns]", "Достоверность, %": "double"},
+}
+
+DEMO_CONFIG = {
+    "batch_size": 500,
+    "flush_interval": 5.0,
+    "poll_interval": 30.0,
+    "sources": [
+        {"type": "http", "name": "ci_cd", "url": "http://127.0.0.1:8765/ci_cd", "dataset": "kpi_daily",
+         "cursor": "date", "pool_size": 4},
+        {"type": "http", "name": "monitoring", "url": "http://127.0.0.1:8765/monitoring", "dataset": "kpi_daily",
+         "cursor": "date", "pool_size": 4},
+        {"type": "sqlite", "name": "surveys", "path": "surveys.db", "dataset": "voc", "cursor": "Дата", "pool_size": 2,
+         "query": 'SELECT "Проект", "Дата", "VOC, %" FROM voc WHERE "Дата" > :cursor ORDER BY "Дата"'},
+    ],
+}
+
+
+# Пулы соединений общие для источников на одном хосте / в одной базе
+POOLS = {}
+
+
+def semaphore_pool(key, size):
+    if key not in POOLS:
+        POOLS[key] = asyncio.Semaphore(size)
+    return POOLS[key]
+
+
+def arrow_schema(dataset):
+    import pyarrow as pa
+
+    return pa.schema([(name, pa.type_for_alias(alias)) for name, alias in SCHEMAS[dataset].items()])
+
+
+class HttpSource:
+    def __init__(self, name, url, dataset, cursor, pool_size=4, timeout=10):
+        self.name = name
+        self.url = url
+        self.dataset = dataset
+        self.cursor_field = cursor
+        self.cursor = ""
+        self.timeout = timeout
+        self.pool = semaphore_pool(urllib.parse.urlsplit(url).netloc, pool_size)
+
+    def _fetch(self):
+        url = self.url + "?" + urllib.parse.urlencode({"since": self.cursor})
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    async def fetch(self):
+        async with self.pool:
+            return await asyncio.to_thread(self._fetch)
+
+
+class SqliteSource:
+    def __init__(self, name, path, query, dataset, cursor, pool_size=2):
+        self.name = name
+        self.query = query
+        self.dataset = dataset
+        self.cursor_field = cursor
+        self.cursor = ""
+        key = "sqlite:" + os.path.abspath(path)
+        if key not in POOLS:
+            POOLS[key] = asyncio.Queue()
+            for _ in range(pool_size):
+                connection = sqlite3.connect(path, check_same_thread=False)
+                connection.row_factory = sqlite3.Row
+                POOLS[key].put_nowait(connection)
+        self.pool = POOLS[key]
+
+    def _fetch(self, connection):
+        return [dict(row) for row in connection.execute(self.query, {"cursor": self.cursor})]
+
+    async def fetch(self):
+        connection = await self.pool.get()
+        try:
+            return await asyncio.to_thread(self._fetch, connection)
+        finally:
+            self.pool.put_nowait(connection)
+
+
+def make_source(config):
+    config = dict(config)
+    kind = config.pop("type")
+    if kind == "http":
+        return HttpSource(**config)
+    if kind == "sqlite":
+        return SqliteSource(**config)
+    raise ValueError(f"Неизвестный тип источника: {kind}")
+
+
+class BatchWriter:
+    def __init__(self, data_dir, batch_size=500):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.lock = asyncio.Lock()
+
+    async def add(self, dataset, rows):
+        async with self.lock:
+            self.buffers.setdefault(dataset, []).extend(rows)
+            if len(self.buffers[dataset]) >= self.batch_size:
+                await self._flush({dataset: self.buffers.pop(dataset)})
+
+    async def flush(self):
+        async with self.lock:
+            buffers, self.buffers = self.buffers, {}
+            await self._flush(buffers)
+
+    async def _flush(self, buffers):
+        written = 0
+        for dataset, rows in buffers.items():
+            if rows:
+                await asyncio.to_thread(self._write, dataset, rows)
+                written += len(rows)
+        if written:
+            cs.bump_version(self.data_dir)
+
+    def _write(self, dataset, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = arrow_schema(dataset)
+        frame = pd.DataFrame(rows).reindex(columns=schema.names)
+        for name, alias in SCHEMAS[dataset].items():
+            if alias.startswith("timestamp"):
+                frame[name] = pd.to_datetime(frame[name])
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        directory = os.path.join(self.data_dir, dataset)
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{int(time.time())}-{uuid.uuid4().hex[:8]}.parquet"
+        # Запись во временный файл и rename: читатели не видят недописанный Parquet
+        pq.write_table(table, os.path.join(directory, "." + name))
+        os.replace(os.path.join(directory, "." + name), os.path.join(directory, name))
+
+
+logger = logging.getLogger(__name__)
+
+
+# Ошибка одного источника (сеть, битая запись, неверный курсор) логируется и не
+# останавливает остальные; курсор двигается только после того, как строки приняты
+async def poll(source, writer, interval):
+    while True:
+        try:
+            rows = await source.fetch()
+            if rows:
+                cursor = max(str(row[source.cursor_field]) for row in rows)
+                await writer.add(source.dataset, rows)
+                source.cursor = cursor
+        except Exception:
+            logger.exception("[%s] ошибка опроса", source.name)
+        await asyncio.sleep(interval)
+
+
+async def flush_periodically(writer, interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await writer.flush()
+        except Exception:
+            logger.exception("ошибка записи пачки")
+
+
+# SIGTERM/SIGINT останавливают опрос, накопленные в буфере строки дописываются на диск
+async def run(config, data_dir):
+    writer = BatchWriter(data_dir, config.get("batch_size", 500))
+    sources = [make_source(source) for source in config["sources"]]
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows или не главный поток: остаётся штатная обработка KeyboardInterrupt
+            pass
+    tasks = [asyncio.create_task(poll(source, writer, config.get("poll_interval", 30.0))) for source in sources]
+    tasks.append(asyncio.create_task(flush_periodically(writer, config.get("flush_interval", 5.0))))
+    try:
+        await stop.wait()
+        logger.info("остановка: запись буфера")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await writer.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сбор KPI в колоночное хранилище дашбордов")
+    parser.add_argument("--config", help="JSON-конфиг источников (по умолчанию DEMO_CONFIG)")
+    parser.add_argument("--data-dir", default=cs.DATA_DIR or "data")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    config = DEMO_CONFIG
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+    asyncio.run(run(config, args.data_dir))
+
+
+if __name__ == "__main__":
+    main()
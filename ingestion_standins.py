@@ -0,0 +1,81 @@
+import argparse
+import http.server
+import json
+import sqlite3
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Локальные заглушки источников для ingestion.py
+# -------------------------------
+# HTTP-сервер отдаёт CI/CD и мониторинг (/ci_cd, /monitoring) начиная с ?since=,
+# SQLite-файл surveys.db содержит таблицу VOC по проектам. Сочетается с
+# DEMO_CONFIG из ingestion.py:
+#   python ingestion_standins.py --days 365 &
+#   DASHBOARD_DATA_DIR=data python ingestion.py
+
+PROJECTS = ["Запуск чат-бота", "Модель оценки риска", "Интеграция CI/CD", "LLM в КЦ", "Облачная миграция"]
+
+
+def kpi_frame(days, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq="D").strftime("%Y-%m-%d"),
+        "ci_cd_success_rate": rng.uniform(0.8, 1.0, size=days),
+        "latency_ms": rng.integers(200, 800, size=days),
+        "uptime": rng.uniform(99.5, 100.0, size=days),
+    })
+
+
+def create_surveys_db(path, days, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq="D").strftime("%Y-%m-%d")
+    rows = [(project, date, float(rng.uniform(70, 90))) for project in PROJECTS for date in dates]
+    with sqlite3.connect(path) as connection:
+        connection.execute('DROP TABLE IF EXISTS voc')
+        connection.execute('CREATE TABLE voc ("Проект" TEXT, "Дата" TEXT, "VOC, %" REAL)')
+        connection.executemany('INSERT INTO voc VALUES (?, ?, ?)', rows)
+
+
+def make_handler(kpi):
+    endpoints = {
+        "/ci_cd": ["date", "ci_cd_success_rate"],
+        "/monitoring": ["date", "latency_ms", "uptime"],
+    }
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            if url.path not in endpoints:
+                self.send_error(404)
+                return
+            since = urllib.parse.parse_qs(url.query).get("since", [""])[0]
+            rows = kpi.loc[kpi["date"] > since, endpoints[url.path]].to_dict(orient="records")
+            body = json.dumps(rows).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушки источников KPI для ingestion.py")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--surveys-db", default="surveys.db")
+    args = parser.parse_args()
+    create_surveys_db(args.surveys_db, args.days)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(kpi_frame(args.days)))
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import contextvars
+import functools
+import json
+import os
+import random
+import secrets
+import threading
+import time
+
+import pandas as pd
+
+# -------------------------------
+# Инструментирование горячих путей (opt-in)
+# -------------------------------
+# Включается переменной DASHBOARD_INSTRUMENT=1. Секции (загрузка данных,
+# преобразования, построение графиков) оборачиваются в section()/timed():
+# на каждый вызов — perf_counter и обновление агрегатов под блокировкой
+# (число вызовов, сумма/максимум времени, гистограмма, строки, размер спецификации).
+# В файл спанов (DASHBOARD_SPANS_FILE, JSON lines в духе OpenTelemetry) попадает
+# только доля DASHBOARD_INSTRUMENT_SAMPLE корневых спанов (по умолчанию 10%);
+# размер спецификации графика считается только для них и уже после остановки
+# таймера, поэтому в измеренное время секции не входит. Без DASHBOARD_INSTRUMENT
+# section() отдаёт общий пустой объект, а timed() возвращает функцию без обёртки.
+
+ENABLED = os.environ.get("DASHBOARD_INSTRUMENT") == "1"
+SAMPLE_RATE = float(os.environ.get("DASHBOARD_INSTRUMENT_SAMPLE", 0.1))
+SPANS_FILE = os.environ.get("DASHBOARD_SPANS_FILE")
+METRICS_FILE = os.environ.get("DASHBOARD_METRICS_FILE")
+
+# Границы гистограммы времени секции, секунды
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_stats = {}
+_current = contextvars.ContextVar("dashboard_span", default=None)
+
+
+class _Stats:
+    __slots__ = ("count", "seconds", "max_seconds", "rows", "spec_bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.spec_bytes = 0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, seconds, rows, spec_bytes):
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows += rows
+        if spec_bytes:
+            self.spec_bytes = spec_bytes
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Span:
+    __slots__ = ("name", "attributes", "rows", "spec_bytes", "trace_id", "span_id", "parent_id",
+                 "sampled", "start", "start_ns", "_charts", "_token")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.rows = 0
+        self.spec_bytes = 0
+        self._charts = []
+
+    def __enter__(self):
+        parent = _current.get()
+        self.sampled = parent.sampled if parent is not None else random.random() < SAMPLE_RATE
+        self.trace_id = parent.trace_id if parent is not None else (secrets.token_hex(16) if self.sampled else None)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = secrets.token_hex(8) if self.sampled else None
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        _current.reset(self._token)
+        if self._charts:
+            import charts
+
+            self.spec_bytes += sum(charts.spec_bytes(chart, with_data=True) for chart in self._charts)
+        with _lock:
+            _stats.setdefault(self.name, _Stats()).add(seconds, self.rows, self.spec_bytes)
+        if self.sampled and SPANS_FILE:
+            _write_span(self, seconds, exc)
+        return False
+
+    # rows — обработанные строки, chart — Altair-график (размер считается только у сэмплированных спанов)
+    def record(self, rows=None, spec_bytes=None, chart=None):
+        if rows is not None:
+            self.rows += int(rows)
+        if chart is not None and self.sampled:
+            self._charts.append(chart)
+        if spec_bytes:
+            self.spec_bytes += int(spec_bytes)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def record(self, rows=None, spec_bytes=None, chart=None):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _write_span(span, seconds, exc):
+    record = {
+        "trace_id": span.trace_id,
+        "span_id": span.span_id,
+        "parent_span_id": span.parent_id,
+        "name": span.name,
+        "start_time_unix_nano": span.start_ns,
+        "end_time_unix_nano": span.start_ns + int(seconds * 1e9),
+        "status": "ERROR" if exc is not None else "OK",
+        "attributes": {**span.attributes, "rows": span.rows, "spec_bytes": span.spec_bytes, "pid": os.getpid()},
+    }
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        with open(SPANS_FILE, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def section(name, **attributes):
+    return Span(name, attributes) if ENABLED else _NOOP
+
+
+# Запись в текущую секцию, без секции — ничего не делает
+def record(rows=None, spec_bytes=None, chart=None):
+    span = _current.get() if ENABLED else None
+    if span is not None:
+        span.record(rows, spec_bytes, chart)
+
+
+# Декоратор для загрузчиков и фрагментов; строки берутся из len() результата-кадра
+def timed(name):
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name) as span:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    span.record(rows=len(result))
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+# -- Экспорт --
+def snapshot():
+    with _lock:
+        rows = [
+            {
+                "Секция": name,
+                "Вызовов": s.count,
+                "Среднее, мс": round(s.seconds / s.count * 1000, 2) if s.count else 0.0,
+                "Максимум, мс": round(s.max_seconds * 1000, 2),
+                "Всего, с": round(s.seconds, 3),
+                "Строк": s.rows,
+                "Спецификация, байт": s.spec_bytes,
+            }
+            for name, s in _stats.items()
+        ]
+    columns = ["Секция", "Вызовов", "Среднее, мс", "Максимум, мс", "Всего, с", "Строк", "Спецификация, байт"]
+    return pd.DataFrame(rows, columns=columns).sort_values("Всего, с", ascending=False, ignore_index=True)
+
+
+def _label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Текстовый формат Prometheus (exposition format 0.0.4)
+def prometheus_text():
+    lines = [
+        "# HELP dashboard_section_seconds Wall time of a dashboard section.",
+        "# TYPE dashboard_section_seconds histogram",
+    ]
+    with _lock:
+        items = [(name, s.count, s.seconds, list(s.buckets), s.rows, s.spec_bytes) for name, s in _stats.items()]
+    for name, count, seconds, buckets, _, _ in items:
+        cumulative = 0
+        for bound, value in zip(BUCKETS, buckets):
+            cumulative += value
+            lines.append(f'dashboard_section_seconds_bucket{{section="{_label(name)}",le="{bound}"}} {cumulative}')
+        lines.append(f'dashboard_section_seconds_bucket{{section="{_label(name)}",le="+Inf"}} {count}')
+        lines.append(f'dashboard_section_seconds_sum{{section="{_label(name)}"}} {seconds:.6f}')
+        lines.append(f'dashboard_section_seconds_count{{section="{_label(name)}"}} {count}')
+    lines += ["# HELP dashboard_section_rows_total Rows processed by a dashboard section.",
+              "# TYPE dashboard_section_rows_total counter"]
+    lines += [f'dashboard_section_rows_total{{section="{_label(name)}"}} {rows}' for name, _, _, _, rows, _ in items]
+    lines += ["# HELP dashboard_section_spec_bytes Last sampled chart spec size of a dashboard section.",
+              "# TYPE dashboard_section_spec_bytes gauge"]
+    lines += [f'dashboard_section_spec_bytes{{section="{_label(name)}"}} {spec}' for name, _, _, _, _, spec in items]
+    lines += ["# HELP dashboard_dataset_bytes Dataset frame size before and after dtype enforcement.",
+              "# TYPE dashboard_dataset_bytes gauge"]
+    for name, stats in _dataset_memory().items():
+        for stage in ("before", "after"):
+            lines.append(f'dashboard_dataset_bytes{{dataset="{_label(name)}",stage="{stage}"}} {stats[stage]}')
+    return "\n".join(lines) + "\n"
+
+
+# Размеры датасетов из schema_registry, если страница его уже загрузила
+def _dataset_memory():
+    import sys
+
+    registry = sys.modules.get("schema_registry")
+    return registry.memory() if registry is not None else {}
+
+
+# Атомарная запись для node_exporter textfile collector
+def write_prometheus(path=None):
+    path = path or METRICS_FILE
+    if not path:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+# Отладочная панель в боковой колонке Streamlit-страницы
+def sidebar_panel():
+    if not ENABLED:
+        return
+    import streamlit as st
+
+    write_prometheus()
+    with st.sidebar.expander("⏱️ Инструментирование", expanded=False):
+        st.dataframe(snapshot(), hide_index=True)
+        if _dataset_memory():
+            import schema_registry
+
+            st.markdown("Память датасетов")
+            st.dataframe(schema_registry.report(), hide_index=True)
+        st.download_button("Метрики (Prometheus)", prometheus_text(), file_name="dashboard_metrics.prom",
+                           mime="text/plain")
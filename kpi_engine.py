@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Оценка KPI план/факт и RAG-статус
+# -------------------------------
+# Отклонение, выполнение плана и статус считаются над массивами целиком
+# (np.select), без Python-функции на каждую ячейку. Стили для Styler тоже
+# строятся одним массивом и навешиваются одним вызовом apply(axis=None).
+
+GREEN_TOLERANCE = 0.01
+AMBER_TOLERANCE = 0.05
+
+RAG_LEVELS = np.array(["Green", "Amber", "Red"])
+RAG_EMOJI = {"Green": "🟢", "Amber": "🟠", "Red": "🔴"}
+RAG_COLORS = {
+    "Red": "background-color: #f8d7da",
+    "Amber": "background-color: #fff3cd",
+    "Green": "background-color: #d4edda"
+}
+
+
+# Выполнение плана: факт/план, для метрик "меньше — лучше" (латентность) — план/факт
+def attainment(plan, fact, lower_is_better=None):
+    plan = np.asarray(plan, dtype=np.float64)
+    fact = np.asarray(fact, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = fact / plan
+        if lower_is_better is not None:
+            ratio = np.where(np.asarray(lower_is_better, dtype=bool), plan / fact, ratio)
+    return ratio
+
+
+def rag_status(ratio, green_tolerance=GREEN_TOLERANCE, amber_tolerance=AMBER_TOLERANCE):
+    return np.select(
+        [ratio >= 1 - green_tolerance, ratio >= 1 - amber_tolerance],
+        RAG_LEVELS[:2],
+        default=RAG_LEVELS[2]
+    )
+
+
+# Добавляет к кадру с колонками "План"/"Факт" отклонение, выполнение и RAG.
+# Колонка "Меньше — лучше" (bool), если есть, разворачивает сравнение.
+def evaluate(kpi, emoji=False, green_tolerance=GREEN_TOLERANCE, amber_tolerance=AMBER_TOLERANCE):
+    lower_is_better = kpi["Меньше — лучше"].to_numpy() if "Меньше — лучше" in kpi.columns else None
+    ratio = attainment(kpi["План"].to_numpy(), kpi["Факт"].to_numpy(), lower_is_better)
+    status = rag_status(ratio, green_tolerance, amber_tolerance)
+    result = kpi.copy()
+    result["Отклонение"] = (result["Факт"] - result["План"]).round(3)
+    result["Выполнение, %"] = np.round(ratio * 100, 1)
+    result["RAG"] = pd.Categorical(
+        pd.Series(status).map(RAG_EMOJI) if emoji else status,
+        categories=[RAG_EMOJI[level] for level in RAG_LEVELS] if emoji else RAG_LEVELS
+    )
+    return result
+
+
+# CSS для всех ячеек сразу: кадр той же формы, заполнен только столбец RAG
+def rag_styles(evaluated, column="RAG"):
+    styles = pd.DataFrame("", index=evaluated.index, columns=evaluated.columns)
+    status = evaluated[column].astype(str).to_numpy()
+    styles[column] = np.select(
+        [status == level for level in RAG_LEVELS],
+        [RAG_COLORS[level] for level in RAG_LEVELS],
+        default=""
+    )
+    return styles
+
+
+def style(evaluated, styles=None, column="RAG"):
+    styles = rag_styles(evaluated, column) if styles is None else styles
+    return evaluated.style.apply(lambda _: styles, axis=None)
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import columnar_source as cs
+import kpi_analytics
+
+# -------------------------------
+# Живой поток KPI для стенового экрана (live-режим app.py)
+# -------------------------------
+# Последние точки держатся в кольцевом буфере фиксированного размера на NumPy-массивах:
+# запись новой пачки — O(размер пачки), старые точки перезаписываются, память не
+# растёт, сколько бы дней ни работала страница. Буфер один на процесс и общий для
+# всех сессий; опрос источника выполняется не чаще раза в интервал, сколько бы
+# экранов ни было открыто. Из хранилища читаются только строки новее последней
+# точки (SQL-запрос query_engine с фильтром по дате); без хранилища точки
+# моделируются случайным блужданием от последних значений — буфер начинается
+# с мок-ряда страницы (history), так что поток его продолжает.
+# Базовая линия потока (EWMA, z-score, флаг аномалии) считается инкрементально
+# kpi_analytics.RollingState при каждом опросе и пишется в тот же буфер рядом с
+# сырыми значениями — история для этого не пересчитывается.
+
+# Модель без хранилища: колонка -> (старт, шаг блуждания, минимум, максимум)
+SIMULATION = {
+    "latency_ms": (450.0, 15.0, 50.0, np.inf),
+    "uptime": (99.8, 0.02, 95.0, 100.0),
+    "ci_cd_success_rate": (0.92, 0.005, 0.0, 1.0),
+}
+
+
+class RingBuffer:
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self._times = np.empty(capacity, dtype="datetime64[ns]")
+        self._values = np.full((len(self.columns), capacity), np.nan)
+        # Точек за всё время работы: счётчик растёт, массивы — нет
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    # times — массив дат, values — {колонка: массив} той же длины
+    def append(self, times, values):
+        times = np.asarray(times, dtype="datetime64[ns]")
+        skip = max(len(times) - self.capacity, 0)
+        n = len(times) - skip
+        if n <= 0:
+            return
+        with self._lock:
+            positions = (self.total + skip + np.arange(n)) % self.capacity
+            self._times[positions] = times[skip:]
+            for i, column in enumerate(self.columns):
+                self._values[i, positions] = np.asarray(values[column], dtype=np.float64)[skip:]
+            self.total += skip + n
+
+    # Окно буфера по порядку времени (копия — запись в буфер её не меняет)
+    def frame(self):
+        with self._lock:
+            start = max(self.total - self.capacity, 0)
+            positions = (start + np.arange(self.total - start)) % self.capacity
+            frame = pd.DataFrame({"date": self._times[positions]})
+            for i, column in enumerate(self.columns):
+                frame[column] = self._values[i, positions]
+            return frame
+
+    def last(self):
+        with self._lock:
+            if self.total == 0:
+                return None, None
+            position = (self.total - 1) % self.capacity
+            return self._times[position], self._values[:, position].copy()
+
+
+class LiveFeed:
+    # history — кадр с date и columns, с которого начинается буфер (без хранилища — те же
+    # мок-данные, что у страницы, чтобы симуляция продолжала их ряд, а не свой)
+    def __init__(self, columns, capacity, seed=None, history=None):
+        self.columns = list(columns)
+        self.derived = [kpi_analytics.column_name(column, suffix) for suffix in (kpi_analytics.EWMA, kpi_analytics.ANOMALY)
+                        for column in self.columns]
+        self.buffer = RingBuffer(capacity, self.columns + self.derived)
+        self.state = kpi_analytics.RollingState(len(self.columns))
+        self._rng = np.random.default_rng(seed)
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+        if history is not None:
+            self._append(history)
+
+    # Опрос не чаще раза в interval секунд на процесс; version — та же, что у страницы
+    # (один движок query_engine на версию данных). Возвращает число новых точек
+    def poll(self, interval, version=None):
+        if time.monotonic() - self._polled_at < interval or not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            if time.monotonic() - self._polled_at < interval:
+                return 0
+            self._polled_at = time.monotonic()
+            frame = self._read(version) if cs.has_dataset("kpi_daily") else self._simulate()
+            self._append(frame)
+            return len(frame)
+        finally:
+            self._lock.release()
+
+    def _append(self, frame):
+        values = frame[self.columns].to_numpy(dtype=np.float64)
+        _, ewma, anomaly = self.state.update(values)
+        derived = np.hstack([ewma, anomaly]) if len(frame) else np.empty((0, len(self.derived)))
+        self.buffer.append(frame["date"].to_numpy(), {
+            **{column: values[:, i] for i, column in enumerate(self.columns)},
+            **{column: derived[:, i] for i, column in enumerate(self.derived)},
+        })
+
+    # Новые строки из хранилища: только новее последней точки и не больше ёмкости буфера
+    def _read(self, version):
+        import query_engine
+
+        last_time, _ = self.buffer.last()
+        filters = [("date", ">", pd.Timestamp(last_time))] if last_time is not None else []
+        sql, params = query_engine.build_aggregate(
+            "kpi_daily",
+            {column: ("avg", column) for column in self.columns},
+            by=["date"],
+            filters=filters,
+            order_by=[("date", False)],
+            limit=self.buffer.capacity,
+            version=version,
+        )
+        # Без кэша запросов: у каждого опроса своя граница по дате
+        frame = query_engine.engine(version).execute(sql, params).to_pandas()
+        return frame.iloc[::-1]
+
+    def _simulate(self):
+        last_time, last_values = self.buffer.last()
+        start, step, low, high = np.array([SIMULATION.get(column, (0.0, 1.0, -np.inf, np.inf))
+                                           for column in self.columns]).T
+        previous = start if last_time is None else last_values[:len(self.columns)]
+        values = np.clip(previous + self._rng.normal(0, step), low, high)
+        return pd.DataFrame({"date": [pd.Timestamp.now()], **{c: [v] for c, v in zip(self.columns, values)}})
@@ -0,0 +1,108 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# -------------------------------
+# Нагрузочный тест callback'а update_detail (app1.py) под gunicorn
+# -------------------------------
+# Для каждого числа воркеров поднимается gunicorn app1:server, затем пул
+# потоков шлёт POST /_dash-update-component с кликами по командам.
+# Результат — по одной JSON-строке на конфигурацию: req/s, p50/p95 задержки.
+#   python loadtest_app1.py --workers 1 2 4 --duration 10 --concurrency 32
+
+TEAMS = ["NLP", "MLOps", "DevOps", "PM"]
+
+
+def payload(team):
+    return json.dumps({
+        "output": "detail-chart.figure",
+        "outputs": {"id": "detail-chart", "property": "figure"},
+        "inputs": [{"id": "team-chart", "property": "clickData", "value": {"points": [{"x": team}]}}],
+        "changedPropIds": ["team-chart.clickData"],
+    }).encode("utf-8")
+
+
+def call(url, body):
+    request = urllib.request.Request(url, data=body, headers={
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip",
+    })
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=10) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"gunicorn не поднялся: {url}")
+
+
+def run(workers, port, duration, concurrency):
+    env = dict(os.environ, GUNICORN_WORKERS=str(workers), GUNICORN_BIND=f"127.0.0.1:{port}", DASH_DEBUG="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app1:server"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_ready(base + "/")
+        url = base + "/_dash-update-component"
+        bodies = [payload(team) for team in TEAMS]
+        latencies = []
+        deadline = time.time() + duration
+
+        def worker(i):
+            local = []
+            while time.time() < deadline:
+                local.append(call(url, bodies[(i + len(local)) % len(bodies)]))
+            return local
+
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+            for local in pool.map(worker, range(concurrency)):
+                latencies.extend(local)
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест update_detail в app1.py")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8060)
+    args = parser.parse_args()
+    for workers in args.workers:
+        print(json.dumps(run(workers, args.port, args.duration, args.concurrency)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
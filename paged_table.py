@@ -0,0 +1,124 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# -------------------------------
+# Постраничная таблица с сортировкой и фильтром на сервере
+# -------------------------------
+# В браузер уходит только видимая страница. Фильтр, поиск и сортировка
+# выполняются бэкендом: PandasBackend держит заранее посчитанные порядки
+# сортировки по каждой колонке (неизменяемые, общие для всех сессий),
+# DuckDBBackend отдаёт ту же работу SQL-запросу по Parquet-хранилищу.
+# Порядок строк полностью детерминирован: равные значения колонки сортировки
+# остаются в исходном порядке (pandas) или добиваются ключом / всеми колонками
+# (DuckDB), пропуски — в конце при любом направлении. Иначе LIMIT/OFFSET на
+# многопоточном DuckDB повторяет или теряет строки между страницами.
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class PandasBackend:
+    def __init__(self, df):
+        self.frame = df.reset_index(drop=True)
+        self.columns = list(self.frame.columns)
+        # Порядки сортировки (в обе стороны) и строки в нижнем регистре считаются один раз на версию данных
+        self._orders = {
+            (column, ascending): self.frame[column].sort_values(ascending=ascending, kind="stable",
+                                                               na_position="last").index.to_numpy()
+            for column in self.columns
+            for ascending in (True, False)
+        }
+        self._text = {
+            column: self.frame[column].astype(str).str.lower().to_numpy(dtype=str)
+            for column in self.columns
+            if not pd.api.types.is_numeric_dtype(self.frame[column])
+        }
+
+    def _mask(self, filters, query):
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, value in (filters or {}).items():
+            mask &= (self.frame[column] == value).to_numpy()
+        if query:
+            query = query.lower()
+            found = np.zeros(len(self.frame), dtype=bool)
+            for values in self._text.values():
+                found |= np.char.find(values, query) >= 0
+            mask &= found
+        return mask
+
+    def count(self, filters=None, query=""):
+        return int(self._mask(filters, query).sum())
+
+    def page(self, filters=None, query="", sort_by=None, ascending=True, offset=0, limit=DEFAULT_PAGE_SIZE):
+        mask = self._mask(filters, query)
+        if sort_by is None:
+            positions = np.flatnonzero(mask)
+        else:
+            order = self._orders[sort_by, ascending]
+            positions = order[mask[order]]
+        return self.frame.iloc[positions[offset:offset + limit]]
+
+
+class DuckDBBackend:
+    # source — путь к Parquet или, вместе с connection, имя представления в общем движке (query_engine).
+    # key — уникальные колонки для стабильного порядка страниц; по умолчанию все колонки
+    def __init__(self, source, extra_columns=None, connection=None, key=None):
+        extra = "".join(f', {expr} AS "{name}"' for name, expr in (extra_columns or {}).items())
+        if connection is None:
+            import duckdb
+
+            pattern = os.path.join(source, "**", "*.parquet") if os.path.isdir(source) else source
+            connection = duckdb.connect()
+            source = f"read_parquet('{pattern}', hive_partitioning = true)"
+        else:
+            source = '"' + source.replace('"', '""') + '"'
+        self.connection = connection
+        self.source = f"(SELECT *{extra} FROM {source})"
+        described = self.connection.execute(f"DESCRIBE SELECT * FROM {self.source}").fetchall()
+        self.columns = [row[0] for row in described]
+        self._text = [row[0] for row in described if row[1] == "VARCHAR"]
+        self._key = list(key or self.columns)
+
+    def _where(self, filters, query):
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            clauses.append(f'"{column}" = ?')
+            params.append(value)
+        if query and self._text:
+            clauses.append("(" + " OR ".join(f'lower("{column}") LIKE ?' for column in self._text) + ")")
+            params.extend([f"%{query.lower()}%"] * len(self._text))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, filters=None, query=""):
+        where, params = self._where(filters, query)
+        # cursor() — отдельное соединение на вызов: сессии Streamlit работают в разных потоках
+        return self.connection.cursor().execute(f"SELECT count(*) FROM {self.source}{where}", params).fetchone()[0]
+
+    def page(self, filters=None, query="", sort_by=None, ascending=True, offset=0, limit=DEFAULT_PAGE_SIZE):
+        where, params = self._where(filters, query)
+        terms = [f'"{sort_by}" {"ASC" if ascending else "DESC"} NULLS LAST'] if sort_by else []
+        terms += [f'"{column}" ASC NULLS LAST' for column in self._key if column != sort_by]
+        order = " ORDER BY " + ", ".join(terms)
+        sql = f"SELECT * FROM {self.source}{where}{order} LIMIT ? OFFSET ?"
+        return self.connection.cursor().execute(sql, params + [limit, offset]).df()
+
+
+def paged_table(backend, key, filters=None, sort_by=None, ascending=True, page_size=DEFAULT_PAGE_SIZE):
+    col_query, col_sort, col_order, col_page = st.columns([3, 3, 2, 2])
+    query = col_query.text_input("Поиск", key=f"{key}_query")
+    sort_options = [None] + backend.columns
+    sort_by = col_sort.selectbox("Сортировка", sort_options, index=sort_options.index(sort_by),
+                                 format_func=lambda column: "—" if column is None else column, key=f"{key}_sort")
+    ascending = col_order.toggle("По возрастанию", value=ascending, key=f"{key}_ascending")
+
+    total = backend.count(filters, query)
+    pages = max(math.ceil(total / page_size), 1)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col_page.number_input("Страница", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+    st.dataframe(backend.page(filters, query, sort_by, ascending, (page - 1) * page_size, page_size), hide_index=True)
+    st.caption(f"Строк: {total} · страница {page} из {pages}")
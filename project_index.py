@@ -0,0 +1,40 @@
+import pandas as pd
+
+# -------------------------------
+# Индекс по проектам для drill-down
+# -------------------------------
+# Кадры разбиваются по "Проект" один раз (groupby по категориальной колонке),
+# дальше выбор проекта — это поиск в словаре вместо булевой маски по всем строкам.
+# Индекс хранится в st.cache_resource и общий для всех сессий: кадры внутри
+# считаются неизменяемыми.
+
+PROJECT_COLUMN = "Проект"
+
+
+def as_categorical(df, column=PROJECT_COLUMN):
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        return df
+    return df.assign(**{column: df[column].astype("category")})
+
+
+def partition(df, column=PROJECT_COLUMN):
+    df = as_categorical(df, column)
+    groups = {name: group.reset_index(drop=True) for name, group in df.groupby(column, observed=True, sort=False)}
+    return groups, df.iloc[0:0]
+
+
+class ProjectIndex:
+    def __init__(self, frames):
+        projects = {}
+        self._groups = {}
+        self._empty = {}
+        for name, df in frames.items():
+            self._groups[name], self._empty[name] = partition(df)
+            projects.update(dict.fromkeys(self._groups[name]))
+        self.projects = list(projects)
+
+    def get(self, name, project):
+        return self._groups[name].get(project, self._empty[name])
+
+    def slice(self, project, names):
+        return tuple(self.get(name, project) for name in names)
@@ -0,0 +1,186 @@
+import collections
+import functools
+import os
+import tempfile
+import threading
+
+import columnar_source as cs
+
+# -------------------------------
+# Встроенный SQL-движок (DuckDB) для произвольных срезов
+# -------------------------------
+# Датасеты колоночного хранилища подключаются как представления поверх
+# read_parquet: DuckDB сам читает только нужные колонки и row group'ы,
+# агрегирует во всех потоках (DASHBOARD_DUCKDB_THREADS) и при нехватке
+# памяти (DASHBOARD_DUCKDB_MEMORY) сбрасывает промежуточные данные на диск
+# (DASHBOARD_DUCKDB_TEMP). Arrow IPC-датасеты и mock-кадры (когда хранилища нет)
+# загружаются в таблицу DuckDB целиком. Запросы только параметризованные:
+# значения идут через ?, имена колонок сверяются со схемой датасета.
+# Результат — pyarrow.Table, неизменяемый, поэтому один и тот же объект
+# из кэша отдаётся всем сессиям и сразу передаётся в st.*_chart / Altair.
+# Соединение и кэш запросов привязаны к версии данных.
+
+THREADS = int(os.environ.get("DASHBOARD_DUCKDB_THREADS", os.cpu_count() or 1))
+MEMORY_LIMIT = os.environ.get("DASHBOARD_DUCKDB_MEMORY")
+TEMP_DIR = os.environ.get("DASHBOARD_DUCKDB_TEMP", os.path.join(tempfile.gettempdir(), "ai-dashboard-duckdb"))
+QUERY_CACHE_SIZE = int(os.environ.get("DASHBOARD_QUERY_CACHE", 256))
+# Сколько версий данных держать подключёнными одновременно (сессии на старой версии)
+ENGINES = int(os.environ.get("DASHBOARD_DUCKDB_ENGINES", 4))
+
+AGGREGATES = {
+    "avg": "avg({})",
+    "min": "min({})",
+    "max": "max({})",
+    "sum": "sum({})",
+    "count": "count({})",
+    "median": "median({})",
+    "p95": "quantile_cont({}, 0.95)",
+}
+GRAINS = ["day", "week", "month", "quarter", "year"]
+OPERATORS = ["=", "!=", "<", "<=", ">", ">=", "in"]
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+class QueryEngine:
+    def __init__(self, version=None):
+        import duckdb
+
+        config = {"threads": THREADS, "temp_directory": TEMP_DIR}
+        if MEMORY_LIMIT:
+            config["memory_limit"] = MEMORY_LIMIT
+        self.version = version
+        self.connection = duckdb.connect(config=config)
+        self.columns = {}
+        for name in cs.DATASETS:
+            self._attach(name)
+
+    def _attach(self, name):
+        path = cs.dataset_path(name)
+        if path is not None and cs._detect_format(path) == "parquet":
+            pattern = os.path.join(path, "**", "*.parquet") if os.path.isdir(path) else path
+            self.connection.execute(
+                f"CREATE VIEW {_quote(name)} AS SELECT * FROM "
+                f"read_parquet({_literal(pattern)}, hive_partitioning = true, union_by_name = true)"
+            )
+        elif path is not None:
+            self.connection.from_arrow(cs.read_arrow(name)).create(name)
+        elif name in cs.FALLBACKS:
+            self.connection.from_df(cs.FALLBACKS[name]()).create(name)
+        else:
+            return
+        described = self.connection.execute(f"DESCRIBE {_quote(name)}").fetchall()
+        self.columns[name] = [row[0] for row in described]
+
+    def column(self, dataset, name):
+        if name not in self.columns.get(dataset, ()):
+            raise KeyError(f"нет колонки {name!r} в датасете {dataset!r}")
+        return _quote(name)
+
+    # cursor() — отдельное соединение на вызов: сессии Streamlit работают в разных потоках
+    def execute(self, sql, params=()):
+        return self.connection.cursor().execute(sql, list(params)).fetch_arrow_table()
+
+
+_engines = collections.OrderedDict()
+_engines_lock = threading.Lock()
+
+
+# Один движок на (каталог, версия): новая версия данных — новые представления.
+# Старые версии вытесняются по LRU, но соединение не закрывается явно: его могут
+# держать запрос в полёте, живой поток или закэшированный DuckDBBackend. Оно
+# закроется само, когда на движок не останется ссылок
+def engine(version=None):
+    key = (cs.DATA_DIR, version)
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = QueryEngine(version)
+        _engines.move_to_end(key)
+        current = _engines[key]
+        # Только что запрошенный движок стоит последним и не вытесняется
+        while len(_engines) > max(ENGINES, 1):
+            _engines.popitem(last=False)
+    return current
+
+
+# sql и params должны быть хэшируемыми: кэш — по тексту запроса, параметрам и версии
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def query(sql, params=(), version=None):
+    return engine(version).execute(sql, params)
+
+
+# filters — список (колонка, оператор, значение); для "in" значение — список
+def _where(eng, dataset, filters):
+    clauses, params = [], []
+    for column, op, value in filters or ():
+        if op not in OPERATORS:
+            raise ValueError(f"неизвестный оператор {op!r}")
+        if value is None:
+            continue
+        if op == "in":
+            values = list(value)
+            clauses.append(f"{eng.column(dataset, column)} IN ({', '.join('?' * len(values))})" if values else "false")
+            params.extend(values)
+        else:
+            clauses.append(f"{eng.column(dataset, column)} {op} ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+# SQL среза: measures — {имя результата: (агрегат, колонка)}, by — колонки группировки,
+# grain — (колонка дат, шаг из GRAINS) для группировки по дню/неделе/месяцу/кварталу/году
+def build_aggregate(dataset, measures, by=(), grain=None, filters=None, order_by=None, limit=None, version=None):
+    eng = engine(version)
+    if dataset not in eng.columns:
+        raise KeyError(f"датасет {dataset!r} не подключён")
+    keys, params = [], []
+    if grain is not None:
+        date_column, step = grain
+        if step not in GRAINS:
+            raise ValueError(f"неизвестный шаг {step!r}")
+        keys.append(f"date_trunc('{step}', {eng.column(dataset, date_column)}) AS {_quote('period')}")
+    keys += [eng.column(dataset, column) for column in by]
+    values = []
+    for alias, (func, column) in measures.items():
+        if func not in AGGREGATES:
+            raise ValueError(f"неизвестный агрегат {func!r}")
+        source = "*" if func == "count" and column is None else eng.column(dataset, column)
+        values.append(f"{AGGREGATES[func].format(source)} AS {_quote(alias)}")
+    where, params = _where(eng, dataset, filters)
+    sql = f"SELECT {', '.join(keys + values)} FROM {_quote(dataset)}{where}"
+    if keys:
+        sql += f" GROUP BY {', '.join(str(i + 1) for i in range(len(keys)))}"
+    order = order_by or ([("period", True)] if grain is not None else [(column, True) for column in by])
+    if order:
+        sql += " ORDER BY " + ", ".join(f"{_quote(column)} {'ASC' if asc else 'DESC'}" for column, asc in order)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, tuple(params)
+
+
+def aggregate(dataset, measures, by=(), grain=None, filters=None, order_by=None, limit=None, version=None):
+    sql, params = build_aggregate(dataset, measures, tuple(by), grain, filters, order_by, limit, version)
+    return query(sql, params, version)
+
+
+# Отбор строк с проекцией колонок, без агрегации
+def select(dataset, columns=None, filters=None, order_by=None, limit=None, version=None):
+    eng = engine(version)
+    if dataset not in eng.columns:
+        raise KeyError(f"датасет {dataset!r} не подключён")
+    projection = ", ".join(eng.column(dataset, column) for column in columns) if columns else "*"
+    where, params = _where(eng, dataset, filters)
+    sql = f"SELECT {projection} FROM {_quote(dataset)}{where}"
+    if order_by:
+        sql += " ORDER BY " + ", ".join(f"{eng.column(dataset, column)} {'ASC' if asc else 'DESC'}"
+                                        for column, asc in order_by)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return query(sql, tuple(params), version)
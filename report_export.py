@@ -0,0 +1,225 @@
+import argparse
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+
+# -------------------------------
+# Пакетная выгрузка отчёта app_final_gantt.py без браузера
+# -------------------------------
+# Для каждого проекта строятся те же Altair-графики, что в проектном дашборде
+# (charts.project_charts), для каждой команды — таблица исполнения сотрудников,
+# график по ней и план-график команды. Графики рендерятся в статические файлы:
+# html и json — средствами Altair, png/svg/pdf — через vl-convert-python
+# (без браузера и сети). Plotly на этой странице нет, поэтому kaleido не нужен.
+# Проекты раздаются пулу процессов; данные (индекс проектов, виды по командам)
+# строятся один раз — в родителе до fork или в инициализаторе процесса — и
+# переиспользуются всеми рендерами. Результат запуска — один zip-архив с
+# manifest.json, который пишется во временный файл и переименовывается.
+#   python report_export.py --out reports --formats png html --workers 8
+
+FORMATS = ["html", "json", "png", "svg", "pdf"]
+VL_CONVERT_FORMATS = {"png", "svg", "pdf"}
+PNG_SCALE = 2
+
+_version = None
+
+
+def _quiet_streamlit():
+    import streamlit.logger
+
+    # Вне streamlit run кэши работают в памяти процесса — предупреждения об этом не нужны
+    streamlit.logger.set_log_level("error")
+
+
+# Данные для рендеров: индекс проектов и виды по командам, один раз на процесс
+def _init(version):
+    global _version
+    _quiet_streamlit()
+    import data_layer as dl
+
+    _version = version
+    dl.load_project_index(version)
+    dl.load_employee_views(version)
+    dl.load_timeline_index(version)
+
+
+def _slug(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(name)).strip("_") or "_"
+
+
+def _html(spec):
+    import altair as alt
+    from altair.utils.html import spec_to_html
+
+    return spec_to_html(spec, "vega-lite", vega_version=alt.VEGA_VERSION, vegaembed_version=alt.VEGAEMBED_VERSION,
+                        vegalite_version=alt.VEGALITE_VERSION)
+
+
+def render(spec, formats):
+    files = {}
+    for fmt in formats:
+        if fmt == "html":
+            files[fmt] = _html(spec).encode("utf-8")
+        elif fmt == "json":
+            files[fmt] = json.dumps(spec, ensure_ascii=False, default=str).encode("utf-8")
+        else:
+            import vl_convert as vlc
+
+            if fmt == "png":
+                files[fmt] = vlc.vegalite_to_png(spec, scale=PNG_SCALE)
+            elif fmt == "svg":
+                files[fmt] = vlc.vegalite_to_svg(spec).encode("utf-8")
+            else:
+                files[fmt] = vlc.vegalite_to_pdf(spec)
+    return files
+
+
+def _chart_files(folder, specs, formats):
+    return [
+        (f"{folder}/{name}.{fmt}", data)
+        for name, spec in specs.items()
+        for fmt, data in render(spec, formats).items()
+    ]
+
+
+# График проектного дашборда -> индекс его кадра в срезе проекта (metrics, voc, accuracy, timeline)
+PROJECT_SOURCES = {"progress": 0, "csat": 0, "delay": 0, "voc": 1, "accuracy": 2, "timeline": 3}
+
+# Спецификация каждого графика строится Altair один раз на процесс (по первому проекту,
+# где он есть); для остальных проектов подменяются только данные. Построение и
+# проверка схемы в Altair стоят на порядок дороже, чем сами данные проекта
+_templates = {}
+
+
+def _with_data(template, df):
+    spec = {key: value for key, value in template.items() if key != "datasets"}
+    spec["data"] = {"values": json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))}
+    return spec
+
+
+def render_project(project, formats):
+    import charts
+    import data_layer as dl
+
+    subsets = dl.load_project_slice(project, _version)
+    specs = {}
+    for name, source in PROJECT_SOURCES.items():
+        if name in ("voc", "accuracy") and subsets[source].empty:
+            continue
+        if name not in _templates:
+            _templates.update({key: chart.to_dict() for key, chart in charts.project_charts(*subsets).items()
+                               if key not in _templates})
+        specs[name] = _with_data(_templates[name], subsets[source])
+    return _chart_files(f"projects/{_slug(project)}", specs, formats)
+
+
+def render_team(team, formats):
+    import altair as alt
+
+    import data_layer as dl
+    import timeline
+
+    performance = dl.load_employee_performance(team, _version)
+    folder = f"teams/{_slug(team)}"
+    files = [(f"{folder}/employees.csv", performance.to_csv(index=False).encode("utf-8"))]
+    team_charts = {
+        "employees": alt.Chart(performance.head(50)).mark_bar(color="#007BFF").encode(
+            x=alt.X("Исполнение, %:Q"),
+            y=alt.Y("Сотрудник:N", sort="-x"),
+            tooltip=["Сотрудник", "План задач", "Факт задач", "Исполнение, %"]
+        ).properties(title=f"{team}: исполнение плана задач, топ-50"),
+    }
+    timeline_index = dl.load_timeline_index(_version)
+    if "Команда" in timeline_index.frame.columns:
+        date_min, date_max = timeline_index.bounds()
+        visible = timeline_index.query(date_min, date_max, [team])
+        if not visible.empty:
+            team_charts["gantt"] = timeline.timeline_chart(visible, date_min, date_max)
+    return files + _chart_files(folder, {name: chart.to_dict() for name, chart in team_charts.items()}, formats)
+
+
+def _task(kind, name, formats):
+    start = time.perf_counter()
+    files = render_project(name, formats) if kind == "project" else render_team(name, formats)
+    return kind, name, files, time.perf_counter() - start
+
+
+def export(out_dir, formats, workers=None, projects=None, teams=None):
+    _quiet_streamlit()
+    import data_layer as dl
+
+    version = dl.get_source_version()
+    start = time.perf_counter()
+    # Данные строятся в родителе: при fork процессы пула получают их без пересчёта
+    _init(version)
+    known_projects = dl.list_projects(version)
+    unknown = [name for name in projects or () if name not in set(known_projects)]
+    unknown += [name for name in teams or () if name not in dl.TEAMS]
+    if unknown:
+        raise ValueError(f"нет в данных: {', '.join(unknown)}")
+    projects = projects or known_projects
+    teams = teams or dl.TEAMS
+    tasks = [("project", name) for name in projects] + [("team", name) for name in teams]
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"report-{stamp}.zip")
+    tmp_path = os.path.join(out_dir, f".report-{stamp}.zip.tmp")
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    workers = workers or os.cpu_count() or 1
+    render_seconds = 0.0
+    files = 0
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle, \
+            concurrent.futures.ProcessPoolExecutor(workers, mp_context=context, initializer=_init,
+                                                   initargs=(version,)) as pool:
+        chunksize = max(len(tasks) // (workers * 4), 1)
+        kinds, names = zip(*tasks) if tasks else ((), ())
+        for kind, name, rendered, seconds in pool.map(_task, kinds, names, [formats] * len(tasks),
+                                                      chunksize=chunksize):
+            render_seconds += seconds
+            for name_in_zip, data in rendered:
+                bundle.writestr(name_in_zip, data)
+                files += 1
+        manifest = {
+            "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "version": version,
+            "formats": formats,
+            "projects": len(projects),
+            "teams": len(teams),
+            "files": files,
+            "render_seconds": round(render_seconds, 2),
+            "wall_seconds": round(time.perf_counter() - start, 2),
+        }
+        bundle.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    os.replace(tmp_path, path)
+    return path, manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная выгрузка графиков app_final_gantt.py по проектам и командам")
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["png", "html"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--projects", nargs="+", help="по умолчанию — все проекты")
+    parser.add_argument("--teams", nargs="+", help="по умолчанию — все команды")
+    args = parser.parse_args()
+    if VL_CONVERT_FORMATS & set(args.formats):
+        try:
+            import vl_convert  # noqa: F401
+        except ImportError:
+            parser.error("для png/svg/pdf нужен vl-convert-python: pip install vl-convert-python")
+    try:
+        path, manifest = export(args.out, args.formats, args.workers, args.projects, args.teams)
+    except ValueError as error:
+        parser.error(str(error))
+    print(json.dumps({"bundle": path, **manifest}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import threading
+
+import pandas as pd
+
+# -------------------------------
+# Реестр компактных типов колонок
+# -------------------------------
+# Для каждого датасета (и производных кадров страниц) объявлено, в каком типе
+# хранится колонка: повторяющиеся строки ("Проект", "Команда", "Квартал", "RAG") —
+# category, счётчики — int16/int32, даты — datetime64[s]. float32 — только у длинных
+# внутренних рядов (kpi_daily), которые до показа прореживаются; значения, которые
+# пользователь видит в таблицах и подсказках (проценты, план/факт), остаются
+# float64 — иначе 99.9 превращается в 99.900002.
+# Типы применяются при загрузке (columnar_source.load): из Arrow строковые колонки
+# приходят сразу словарными, без промежуточных object-массивов. Кадры после
+# приведения общие для всех сессий (st.cache_resource) и не изменяются на месте.
+# Для каждого кадра запоминается размер до и после приведения — report()
+# показывает экономию по датасетам (боковая панель инструментирования, бенчмарк).
+
+DATE = "datetime64[s]"
+
+SCHEMAS = {
+    "kpi_daily": {
+        "date": "datetime64[ns]",
+        "precision": "float32",
+        "recall": "float32",
+        "latency_ms": "float32",
+        "ci_cd_success_rate": "float32",
+        "uptime": "float32",
+        "nps": "float32",
+    },
+    "project_metrics": {
+        "Проект": "category",
+        "Квартал": pd.CategoricalDtype(["Q1", "Q2", "Q3", "Q4"], ordered=True),
+        "Прогресс, %": "float64",
+        "CSAT, %": "float64",
+        "Отклонение от срока, дней": "int16",
+    },
+    "voc": {"Проект": "category", "Дата": DATE, "VOC, %": "float64"},
+    "accuracy": {"Проект": "category", "Дата": DATE, "Достоверность, %": "float64"},
+    "project_timeline": {"Проект": "category", "Начало": DATE, "Окончание": DATE, "Команда": "category"},
+    "employees": {"Команда": "category", "Сотрудник": "category", "План задач": "int16", "Факт задач": "int16"},
+    "kpi_teams": {"Команда": "category", "Показатель": "category", "План": "float64", "Факт": "float64"},
+    "spending": {"2025": "int32", "2026": "int32"},
+    # Производные кадры data_layer
+    "kpi": {"Отклонение": "float64", "Выполнение, %": "float64", "RAG": "category"},
+    "employee_performance": {"Исполнение, %": "float64"},
+}
+
+_lock = threading.Lock()
+_memory = {}
+
+
+def dtype_of(name, column):
+    return SCHEMAS.get(name, {}).get(column)
+
+
+def _is_category(dtype):
+    return dtype == "category" or isinstance(dtype, pd.CategoricalDtype)
+
+
+# Почти уникальные строки (ФИО, номер показателя) в category только раздувают кадр
+# словарём размером с сами данные — такие колонки остаются строковыми
+def _worth_category(unique, rows):
+    return unique * 2 <= rows
+
+
+def _bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# Arrow -> pandas с типами реестра: словарные колонки становятся category без object-копии.
+# Размер "до" — по выборке строк в типах pandas по умолчанию, без материализации всего кадра
+def to_pandas(table, name, sample_rows=10_000):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    sample = table.slice(0, sample_rows)
+    before = _bytes(sample.to_pandas()) * table.num_rows // max(sample.num_rows, 1)
+    for i, field in enumerate(table.schema):
+        dtype = dtype_of(name, field.name)
+        if (_is_category(dtype) and not pa.types.is_dictionary(field.type)
+                and _worth_category(pc.count_distinct(table.column(i)).as_py(), table.num_rows)):
+            table = table.set_column(i, field.name, pc.dictionary_encode(table.column(i)))
+    return enforce(table.to_pandas(), name, before)
+
+
+# Приводит колонки кадра к типам реестра; остальные колонки не трогает
+def enforce(df, name, before=None):
+    schema = SCHEMAS.get(name, {})
+    before = _bytes(df) if before is None else before
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if _is_category(dtype) and not _worth_category(df[column].nunique(), len(df)):
+            continue
+        if dtype == DATE or str(dtype).startswith("datetime64"):
+            converted[column] = pd.to_datetime(df[column]).astype(dtype)
+        elif str(dtype).startswith("int") and df[column].isna().any():
+            # Пропуски в целых — в nullable-тип той же ширины
+            converted[column] = df[column].astype(str(dtype).capitalize())
+        else:
+            converted[column] = df[column].astype(dtype)
+    if converted:
+        df = df.assign(**converted)
+    with _lock:
+        _memory[name] = {"rows": len(df), "before": before, "after": _bytes(df)}
+    return df
+
+
+# Размер датасетов, прошедших через enforce() в этом процессе
+def report():
+    with _lock:
+        items = list(_memory.items())
+    rows = [
+        {
+            "Датасет": name,
+            "Строк": stats["rows"],
+            "До, КБ": round(stats["before"] / 1024, 1),
+            "После, КБ": round(stats["after"] / 1024, 1),
+            "Экономия, %": round((1 - stats["after"] / stats["before"]) * 100, 1) if stats["before"] else 0.0,
+        }
+        for name, stats in items
+    ]
+    columns = ["Датасет", "Строк", "До, КБ", "После, КБ", "Экономия, %"]
+    return pd.DataFrame(rows, columns=columns).sort_values("До, КБ", ascending=False, ignore_index=True)
+
+
+def memory():
+    with _lock:
+        return {name: dict(stats) for name, stats in _memory.items()}
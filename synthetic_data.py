@@ -0,0 +1,209 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import columnar_source as cs
+import ingestion
+
+# -------------------------------
+# Синтетические данные в масштабе продакшена
+# -------------------------------
+# Генератор покрывает все датасеты колоночного хранилища: дневные KPI, квартальные
+# метрики проектов, VOC и достоверность, план-график, сотрудников, KPI команд и
+# дерево расходов. Каждая пачка строк [start, stop) строится векторно в NumPy
+# собственным генератором, посеянным (seed, датасет, номер пачки), — при тех же
+# seed и --chunk-rows результат воспроизводится байт в байт. Пачки сразу
+# пишутся row group'ами в Parquet через ParquetWriter, весь датасет в памяти не
+# собирается. Строки отсортированы по ключу фильтра (дата/проект/команда), так что
+# статистики row group'ов отсекают лишнее при чтении.
+#   python synthetic_data.py --data-dir data --projects 100000 --kpi-rows 5000000 --seed 42
+
+TEAMS = ["NLP", "MLOps", "DevOps", "PM"]
+QUARTERS = np.array(["Q1", "Q2", "Q3", "Q4"])
+KPI_NAMES = np.array(["Precision классификации", "% CI/CD-деплоев", "Аптайм сервисов", "Кол-во MVP за квартал"])
+KPI_PLANS = np.array([0.92, 0.97, 99.9, 8.0])
+SPENDING_CATEGORIES = np.array(["ФОТ", "R&D", "Инфраструктура", "PM / Support / QA"])
+YEARS = [2025, 2026]
+START = np.datetime64("2025-01-01", "D")
+
+# Схемы совпадают с тем, что пишет сборщик (ingestion.SCHEMAS), остальные — по mock-кадрам
+SCHEMAS = {
+    **ingestion.SCHEMAS,
+    "project_timeline": {"Проект": "string", "Начало": "date32", "Окончание": "date32", "Команда": "string"},
+    "employees": {"Команда": "string", "Сотрудник": "string", "План задач": "int64", "Факт задач": "int64"},
+    "kpi_teams": {"Команда": "string", "Показатель": "string", "План": "double", "Факт": "double"},
+    "spending": {"Категория": "string", **{str(year): "int64" for year in YEARS}},
+}
+
+DEFAULT_SIZES = {
+    "projects": 1_000,
+    "kpi_rows": 100_000,
+    "kpi_freq": "1h",
+    "voc_points": 12,
+    "accuracy_points": 26,
+    "employees": 10_000,
+    "kpi_teams": 1_000,
+    "spending": 1_000,
+}
+
+
+def _names(prefix, ids, width=7):
+    return np.char.add(prefix, np.char.zfill(ids.astype(str), width))
+
+
+def _team_of(ids, n):
+    return np.array(TEAMS)[ids * len(TEAMS) // max(n, 1)]
+
+
+# -- Датасеты: (rng, ids, sizes) -> кадр строк с глобальными номерами ids --
+def kpi_daily(rng, ids, sizes):
+    step = pd.Timedelta(sizes["kpi_freq"]).to_timedelta64()
+    season = np.sin(ids * (2 * np.pi / max(sizes["kpi_rows"] // 52, 1)))
+    return pd.DataFrame({
+        "date": np.datetime64("2025-06-01", "ns") + ids * step,
+        "precision": np.clip(0.885 + 0.04 * season + rng.normal(0, 0.02, len(ids)), 0, 1),
+        "recall": np.clip(0.85 + 0.04 * season + rng.normal(0, 0.02, len(ids)), 0, 1),
+        "latency_ms": rng.gamma(9.0, 55.0, len(ids)),
+        "ci_cd_success_rate": rng.beta(18, 2, len(ids)),
+        "uptime": 100 - rng.exponential(0.15, len(ids)),
+        "nps": np.clip(60 + 15 * season + rng.normal(0, 8, len(ids)), -100, 100),
+    })
+
+
+def project_metrics(rng, ids, sizes):
+    quarter = ids % 4
+    return pd.DataFrame({
+        "Проект": _names("Проект ", ids // 4),
+        "Квартал": QUARTERS[quarter],
+        "Прогресс, %": np.minimum((quarter + 1) * 25 + rng.integers(-20, 5, len(ids)), 100).astype(float),
+        "CSAT, %": rng.normal(87, 3, len(ids)).round(),
+        "Отклонение от срока, дней": rng.integers(-5, 9, len(ids)).astype(float),
+    })
+
+
+def _series(rng, ids, points, step, low, high, column):
+    project, point = ids // points, ids % points
+    level = low + (high - low) * (0.3 + 0.6 * point / max(points - 1, 1))
+    return pd.DataFrame({
+        "Проект": _names("Проект ", project),
+        "Дата": (START + point * step).astype("datetime64[ns]"),
+        column: np.clip(level + rng.normal(0, 1.5, len(ids)), low, high).round(1),
+    })
+
+
+def voc(rng, ids, sizes):
+    return _series(rng, ids, sizes["voc_points"], np.timedelta64(30, "D"), 70, 95, "VOC, %")
+
+
+def accuracy(rng, ids, sizes):
+    return _series(rng, ids, sizes["accuracy_points"], np.timedelta64(7, "D"), 85, 99, "Достоверность, %")
+
+
+def project_timeline(rng, ids, sizes):
+    # Начала идут по возрастанию вместе с номером проекта — как в TimelineIndex
+    span_days = 3 * 365
+    starts = START + (ids * span_days // max(sizes["projects"], 1)).astype("timedelta64[D]")
+    durations = rng.integers(14, 365, len(ids)).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "Проект": _names("Проект ", ids),
+        "Начало": starts,
+        "Окончание": starts + durations,
+        "Команда": rng.choice(TEAMS, len(ids)),
+    })
+
+
+def employees(rng, ids, sizes):
+    plan = rng.integers(10, 40, len(ids))
+    return pd.DataFrame({
+        "Команда": _team_of(ids, sizes["employees"]),
+        "Сотрудник": _names("Сотрудник ", ids),
+        "План задач": plan,
+        "Факт задач": np.maximum(plan + rng.integers(-6, 6, len(ids)), 0),
+    })
+
+
+def kpi_teams(rng, ids, sizes):
+    kind = ids % len(KPI_NAMES)
+    plan = KPI_PLANS[kind]
+    return pd.DataFrame({
+        "Команда": _team_of(ids, sizes["kpi_teams"]),
+        "Показатель": np.char.add(KPI_NAMES[kind], np.char.add(" #", (ids // len(KPI_NAMES)).astype(str))),
+        "План": plan,
+        "Факт": (plan * rng.normal(0.97, 0.03, len(ids))).round(3),
+    })
+
+
+# Метки "Категория — Подкатегория (N чел)", как их разбирает cost_cube.parse_label
+def spending(rng, ids, sizes):
+    group = ids // len(SPENDING_CATEGORIES)
+    category = SPENDING_CATEGORIES[ids % len(SPENDING_CATEGORIES)]
+    # первые подкатегории — команды (cost_cube относит их к команде), дальше — направления
+    sub = np.where(group < len(TEAMS), np.array(TEAMS)[group % len(TEAMS)], _names("Направление ", group, 5))
+    heads = np.char.add(np.char.add(" (", rng.integers(1, 12, len(ids)).astype(str)), " чел)")
+    base = rng.integers(100, 1_500, len(ids))
+    frame = {"Категория": np.char.add(np.char.add(np.char.add(category, " — "), sub), heads)}
+    for k, year in enumerate(YEARS):
+        frame[str(year)] = (base * (1 + 0.08 * k + rng.normal(0, 0.03, len(ids)))).astype(np.int64)
+    return pd.DataFrame(frame)
+
+
+GENERATORS = {
+    "kpi_daily": (kpi_daily, lambda s: s["kpi_rows"]),
+    "project_metrics": (project_metrics, lambda s: s["projects"] * 4),
+    "voc": (voc, lambda s: s["projects"] * s["voc_points"]),
+    "accuracy": (accuracy, lambda s: s["projects"] * s["accuracy_points"]),
+    "project_timeline": (project_timeline, lambda s: s["projects"]),
+    "employees": (employees, lambda s: s["employees"]),
+    "kpi_teams": (kpi_teams, lambda s: s["kpi_teams"]),
+    "spending": (spending, lambda s: s["spending"]),
+}
+
+
+def write_dataset(name, data_dir, sizes, seed=0, chunk_rows=500_000):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    generate, count = GENERATORS[name]
+    total = count(sizes)
+    schema = pa.schema([(column, pa.type_for_alias(dtype)) for column, dtype in SCHEMAS[name].items()])
+    dataset_dir = os.path.join(data_dir, name)
+    os.makedirs(dataset_dir, exist_ok=True)
+    path = os.path.join(dataset_dir, "part-synthetic.parquet")
+    tmp_path = os.path.join(dataset_dir, ".part-synthetic.parquet")
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        for chunk, start in enumerate(range(0, total, chunk_rows)):
+            rng = np.random.default_rng([seed, list(GENERATORS).index(name), chunk])
+            ids = np.arange(start, min(start + chunk_rows, total), dtype=np.int64)
+            frame = generate(rng, ids, sizes)
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+    # Запись во временный файл и rename: читатели не видят недописанный Parquet
+    os.replace(tmp_path, path)
+    return total
+
+
+def generate_store(data_dir, sizes=None, seed=0, chunk_rows=500_000, datasets=None):
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    rows = {name: write_dataset(name, data_dir, sizes, seed, chunk_rows) for name in (datasets or GENERATORS)}
+    cs.bump_version(data_dir)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Синтетические данные для колоночного хранилища дашбордов")
+    parser.add_argument("--data-dir", default=cs.DATA_DIR or "data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--datasets", nargs="+", choices=list(GENERATORS))
+    for key, value in DEFAULT_SIZES.items():
+        parser.add_argument("--" + key.replace("_", "-"), type=type(value), default=value)
+    args = parser.parse_args()
+    sizes = {key: getattr(args, key) for key in DEFAULT_SIZES}
+    os.makedirs(args.data_dir, exist_ok=True)
+    for name, total in generate_store(args.data_dir, sizes, args.seed, args.chunk_rows, args.datasets).items():
+        print(f"{name}: {total} строк")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+import capacity
+
+WINDOW = (pd.Timestamp("2025-01-01"), pd.Timestamp("2025-12-31"))
+
+
+def _tasks(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp("2024-11-01") + pd.to_timedelta(rng.integers(0, 500, n), unit="D")
+    return pd.DataFrame({
+        "Проект": [f"Проект {i % 50}" for i in range(n)],  # имена повторяются
+        "Начало": starts,
+        "Окончание": starts + pd.to_timedelta(rng.integers(0, 90, n), unit="D"),
+    })
+
+
+# Эталон: загрузка по дням перебором задач с обрезкой окном
+def _reference(tasks):
+    days = pd.date_range(*WINDOW, freq="D")
+    spans = {}
+    for row, start, end in zip(tasks.index, tasks["Начало"], tasks["Окончание"]):
+        if end < WINDOW[0] or start > WINDOW[1]:
+            spans[row] = None
+        else:
+            spans[row] = (max(start, WINDOW[0]), min(end, WINDOW[1]))
+    load = np.array([sum(1 for span in spans.values() if span and span[0] <= day <= span[1]) for day in days])
+    return days, spans, load
+
+
+def _check(tracker, tasks):
+    days, spans, load = _reference(tasks)
+    assert [tracker.load_on(day) for day in days] == load.tolist()
+    for row, span in spans.items():
+        assert tracker.in_window(row) == (span is not None)
+        if span is None:
+            continue
+        inside = (days >= span[0]) & (days <= span[1])
+        assert tracker.peak(row) == load[inside].max()
+        others = sum(1 for other, o in spans.items() if other != row and o and o[0] <= span[1] and o[1] >= span[0])
+        assert tracker.overlaps(row) == others
+
+
+def test_tracker_matches_brute_force():
+    tasks = _tasks()
+    _check(capacity.CapacityTracker(tasks, *WINDOW), tasks)
+
+
+def test_tracker_update_matches_rebuild():
+    tasks = _tasks(seed=1)
+    tracker = capacity.CapacityTracker(tasks, *WINDOW)
+    rng = np.random.default_rng(2)
+    for row in rng.choice(tasks.index, 40, replace=False):
+        shift = pd.Timedelta(days=int(rng.integers(-400, 400)))
+        tasks.loc[row, ["Начало", "Окончание"]] += shift
+        tracker.update(row, tasks.at[row, "Начало"], tasks.at[row, "Окончание"])
+    _check(tracker, tasks)
+
+
+def test_daily_load_matches_tracker_and_handles_empty():
+    tasks = _tasks(seed=3)
+    load = capacity.daily_load(tasks, *WINDOW)
+    tracker = capacity.CapacityTracker(tasks, *WINDOW)
+    assert load["Проектов"].tolist() == [tracker.load_on(day) for day in load["День"]]
+    empty = capacity.daily_load(tasks.iloc[0:0], *WINDOW)
+    assert empty.empty and list(empty.columns) == ["Команда", "День", "Проектов"]
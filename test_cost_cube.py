@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import cost_cube
+
+SPENDING = pd.DataFrame({
+    "Категория": ["ФОТ — NLP (6 чел)", "ФОТ — MLOps (4 чел)", "R&D — Исследования", "Инфраструктура"],
+    "2025": [1_201, 805, 2_000, 1_000],
+    "2026": [1_300, 900, 2_300, 1_400],
+})
+
+
+@pytest.mark.parametrize("label, parsed", [
+    ("ФОТ — NLP (6 чел)", ("ФОТ", "NLP", "NLP")),
+    ("R&D — Исследования", ("R&D", "Исследования", cost_cube.COMMON_TEAM)),
+    ("Инфраструктура", ("Инфраструктура", "Инфраструктура", cost_cube.COMMON_TEAM)),
+])
+def test_parse_label(label, parsed):
+    assert cost_cube.parse_label(label) == parsed
+
+
+# Раскладка по месяцам целыми частями сохраняет итог года
+def test_monthly_split_keeps_yearly_totals():
+    facts = cost_cube.facts_from_spending(SPENDING)
+    assert len(facts) == len(SPENDING) * 2 * 12
+    yearly = facts.groupby(["Категория", "Подкатегория", cost_cube.PERIOD])[cost_cube.MEASURE].sum()
+    assert yearly.loc[("ФОТ", "NLP", 2025)] == 1_201
+    assert yearly.sum() == SPENDING[["2025", "2026"]].to_numpy().sum()
+    monthly = facts[facts["Подкатегория"] == "NLP"].groupby(cost_cube.PERIOD)[cost_cube.MEASURE]
+    assert (monthly.max() - monthly.min()).max() <= 1
+
+
+# Агрегат любого уровня совпадает с прямым groupby по фактам
+@pytest.mark.parametrize("level", cost_cube.LEVELS)
+def test_rollups_match_groupby(level):
+    facts = cost_cube.facts_from_spending(SPENDING)
+    cube = cost_cube.CostCube(facts)
+    keys = list(cost_cube.LEVELS[:cost_cube.LEVELS.index(level) + 1])
+    expected = facts.groupby(keys + [cost_cube.PERIOD])[cost_cube.MEASURE].sum().unstack(cost_cube.PERIOD)
+    expected.columns = [str(column) for column in expected.columns]
+
+    # Измерения куба — category/int8, у groupby — строки и int64: сравниваются значения
+    def flat(agg):
+        return agg.reset_index().astype({key: str for key in keys}).sort_values(keys).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(flat(cube.level(level)), flat(expected), check_dtype=False)
+
+
+def test_drill_down_and_totals():
+    cube = cost_cube.CostCube(cost_cube.facts_from_spending(SPENDING))
+    assert cube.total()["2026"] == SPENDING["2026"].sum()
+    assert cube.total(Категория="ФОТ")["2025"] == 1_201 + 805
+    children = cube.children(Категория="ФОТ")
+    assert set(children.index) == {"NLP", "MLOps"}
+    assert children.loc["NLP", "2026"] == 1_300
+
+
+def test_yoy():
+    cube = cost_cube.CostCube(cost_cube.facts_from_spending(SPENDING))
+    result = cost_cube.yoy(cube.level("Категория"), 2025, 2026)
+    assert result.loc["Инфраструктура", "Δ, млн ₽"] == 400
+    assert result.loc["Инфраструктура", "Δ, %"] == 40.0
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import downsampling
+
+
+def _frame(n=20_000):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "date": pd.date_range("2025-06-01", periods=n, freq="min"),
+        "latency_ms": rng.gamma(9.0, 55.0, n),
+        "precision": rng.normal(0.9, 0.02, n),
+    })
+    # Метрики разных источников после склейки по дате: длинный пропуск и редкие замеры
+    frame.loc[5_000:9_000, "latency_ms"] = np.nan
+    frame.loc[frame.index % 60 != 0, "precision"] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_skips_nan_gaps(method):
+    frame = _frame()
+    result = downsampling.downsample(frame, "date", ["latency_ms", "precision"], method=method)
+    assert 0 < len(result) <= downsampling.target_points() + 2
+    assert result["date"].is_monotonic_increasing
+    # Пики сохраняются, NaN-точки не выбираются вместо значений
+    assert result["latency_ms"].max() == frame["latency_ms"].max()
+    assert result["precision"].notna().sum() > 3
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_all_nan_column(method):
+    frame = _frame().assign(precision=np.nan)
+    result = downsampling.downsample(frame, "date", ["latency_ms", "precision"], method=method)
+    assert result["latency_ms"].notna().all()
+    assert result["precision"].isna().all()
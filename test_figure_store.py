@@ -0,0 +1,50 @@
+import os
+import stat
+
+import figure_store
+
+
+def _figure(points):
+    return {"data": [{"type": "bar", "y": points}], "layout": {"title": {"text": "Команда"}}}
+
+
+def test_file_store_roundtrip(tmp_path):
+    store = figure_store.FileFigureStore(str(tmp_path / "figures"))
+    assert store.get("mock-1:abc:NLP") is None
+    store.set("mock-1:abc:NLP", _figure([1, 2]))
+    assert store.get("mock-1:abc:NLP") == _figure([1, 2])
+    # Ключи с другой версией данных не пересекаются
+    assert store.get("mock-2:abc:NLP") is None
+    assert stat.S_IMODE(os.stat(tmp_path / "figures").st_mode) == 0o700
+    assert not [name for name in os.listdir(tmp_path / "figures") if name.endswith(".tmp")]
+
+
+# Каталог недоступен для записи — set() молча пропускает кэш, get() отдаёт None
+def test_file_store_ignores_write_errors(tmp_path, monkeypatch):
+    store = figure_store.FileFigureStore(str(tmp_path / "figures"))
+
+    def fail(*args, **kwargs):
+        raise OSError("нет места")
+
+    monkeypatch.setattr(figure_store.os, "replace", fail)
+    store.set("key", _figure([1]))
+    assert store.get("key") is None
+    assert os.listdir(tmp_path / "figures") == []
+
+
+def test_fingerprint_tracks_code_and_values():
+    def build(team):
+        return team
+
+    def build_changed(team):
+        return team.upper()
+
+    assert figure_store.fingerprint(build, "6.0") == figure_store.fingerprint(build, "6.0")
+    assert figure_store.fingerprint(build, "6.0") != figure_store.fingerprint(build_changed, "6.0")
+    assert figure_store.fingerprint(build, "6.0") != figure_store.fingerprint(build, "6.1")
+
+
+# Без redis или с некорректным REDIS_URL — каталог на диске
+def test_default_store_falls_back_to_files(monkeypatch):
+    monkeypatch.setattr(figure_store, "REDIS_URL", "not-a-url")
+    assert isinstance(figure_store.default_store(), figure_store.FileFigureStore)
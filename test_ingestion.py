@@ -0,0 +1,67 @@
+import asyncio
+import os
+import signal
+import sqlite3
+
+import pyarrow.dataset as ds
+
+import columnar_source as cs
+import ingestion
+
+
+def _database(path, rows=20):
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE kpi (date TEXT, latency_ms REAL, uptime REAL)")
+    connection.executemany("INSERT INTO kpi VALUES (?, ?, ?)",
+                           [(f"2025-06-{day:02d}", 300.0 + day, 99.9) for day in range(1, rows + 1)])
+    connection.commit()
+    connection.close()
+
+
+def _config(path, **sources):
+    return {
+        "batch_size": 1000,
+        "poll_interval": 0.05,
+        "flush_interval": 60.0,
+        "sources": [
+            {"type": "sqlite", "name": name, "path": str(path), "query": query, "dataset": "kpi_daily",
+             "cursor": "date"}
+            for name, query in sources.items()
+        ],
+    }
+
+
+def test_batch_writer_writes_schema_and_bumps_version(tmp_path):
+    writer = ingestion.BatchWriter(str(tmp_path), batch_size=1000)
+
+    async def write():
+        await writer.add("kpi_daily", [{"date": "2025-06-01", "uptime": 99.9}])
+        await writer.flush()
+
+    asyncio.run(write())
+    table = ds.dataset(tmp_path / "kpi_daily", format="parquet").to_table()
+    assert table.schema == ingestion.arrow_schema("kpi_daily")
+    assert table.column("latency_ms").null_count == 1
+    assert cs.current_version(str(tmp_path)) == 1
+    assert not [name for name in os.listdir(tmp_path / "kpi_daily") if name.startswith(".")]
+
+
+# Сломанный источник не останавливает остальные; SIGTERM дописывает буфер на диск
+def test_run_flushes_buffer_on_sigterm(tmp_path, caplog):
+    database = tmp_path / "kpi.sqlite"
+    _database(database)
+    config = _config(
+        database,
+        good="SELECT date, latency_ms, uptime FROM kpi WHERE date > :cursor ORDER BY date",
+        broken="SELECT * FROM no_such_table",
+    )
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.3, os.kill, os.getpid(), signal.SIGTERM)
+        await ingestion.run(config, str(tmp_path / "data"))
+
+    asyncio.run(main())
+    table = ds.dataset(tmp_path / "data" / "kpi_daily", format="parquet").to_table()
+    # Курсор двигается после приёма строк — повторные опросы не дублируют их
+    assert table.num_rows == 20
+    assert "[broken] ошибка опроса" in caplog.text
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+import kpi_analytics
+
+# Доля ложных аномалий на нормальном шуме — как у |z| > 3 при известных параметрах (~0.27%)
+NOMINAL_RATE = 0.0027
+
+
+def _noise(n=100_000, seed=0):
+    return np.random.default_rng(seed).normal(size=n)
+
+
+def test_rolling_false_positive_rate_on_noise():
+    values = _noise()
+    flags = kpi_analytics.rolling(pd.DataFrame({"v": values}), "v")[kpi_analytics.column_name("v", kpi_analytics.ANOMALY)]
+    assert flags.mean() < 2 * NOMINAL_RATE
+
+
+def test_rolling_state_false_positive_rate_on_noise():
+    values = _noise(seed=1).reshape(-1, 4)
+    _, _, flags = kpi_analytics.RollingState(values.shape[1]).update(values)
+    assert flags.mean() < 2 * NOMINAL_RATE
+
+
+def test_rolling_state_matches_rolling():
+    values = _noise(5_000, seed=2)
+    values[1_000] = 12.0
+    values[2_000] = np.nan
+    frame = kpi_analytics.rolling(pd.DataFrame({"v": values}), "v")
+    z, ewma, flags = kpi_analytics.RollingState(1).update(values[:, None])
+    np.testing.assert_allclose(z[:, 0], frame[kpi_analytics.column_name("v", kpi_analytics.Z)], atol=1e-6)
+    np.testing.assert_allclose(ewma[:, 0], frame[kpi_analytics.column_name("v", kpi_analytics.EWMA)], atol=1e-6)
+    np.testing.assert_array_equal(flags[:, 0], frame[kpi_analytics.column_name("v", kpi_analytics.ANOMALY)])
+    assert flags[1_000, 0]
@@ -0,0 +1,66 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from paged_table import DuckDBBackend, PandasBackend
+
+
+# Много равных значений и пропусков в колонке сортировки — там, где без ключа страницы плывут
+def _frame(rows=1000):
+    rng = np.random.default_rng(15)
+    score = rng.integers(0, 5, rows).astype("float64")
+    score[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "Команда": rng.choice(["A", "B", "C"], rows),
+        "Балл": score,
+    })
+
+
+def _backends(df):
+    connection = duckdb.connect()
+    connection.execute("SET threads = 4")
+    # Таблица, а не register(): cursor() бэкенда не видит зарегистрированные кадры
+    connection.execute("CREATE TABLE frame AS SELECT * FROM df")
+    return [PandasBackend(df), DuckDBBackend("frame", connection=connection)]
+
+
+def _pages(backend, size, **kwargs):
+    total = backend.count(kwargs.get("filters"), kwargs.get("query", ""))
+    return pd.concat([backend.page(offset=offset, limit=size, **kwargs) for offset in range(0, total, size)])
+
+
+@pytest.mark.parametrize("backend", range(2))
+@pytest.mark.parametrize("sort_by, ascending", [(None, True), ("Балл", True), ("Балл", False), ("Команда", False)])
+def test_pages_cover_rows_once(backend, sort_by, ascending):
+    df = _frame()
+    table = _backends(df)[backend]
+    pages = _pages(table, 37, filters={"Команда": "B"}, sort_by=sort_by, ascending=ascending)
+    expected = df.loc[df["Команда"] == "B", "id"]
+    assert len(pages) == len(expected)
+    assert sorted(pages["id"]) == sorted(expected)
+    # Повторный обход даёт тот же порядок
+    again = _pages(table, 37, filters={"Команда": "B"}, sort_by=sort_by, ascending=ascending)
+    assert pages["id"].tolist() == again["id"].tolist()
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_pandas_order(ascending):
+    df = _frame()
+    pages = _pages(PandasBackend(df), 50, sort_by="Балл", ascending=ascending)
+    # Пропуски в конце при любом направлении, равные значения — в исходном порядке
+    assert pages["Балл"].isna().to_numpy()[-df["Балл"].isna().sum():].all()
+    values = pages["Балл"].dropna()
+    assert (values.diff().dropna() >= 0).all() if ascending else (values.diff().dropna() <= 0).all()
+    for _, group in pages.groupby("Балл", dropna=False):
+        assert group["id"].is_monotonic_increasing
+
+
+def test_duckdb_matches_pandas():
+    df = _frame()
+    pandas_table, duckdb_table = _backends(df)
+    for ascending in (True, False):
+        left = _pages(pandas_table, 50, sort_by="Балл", ascending=ascending)
+        right = _pages(duckdb_table, 50, sort_by="Балл", ascending=ascending)
+        assert left["id"].tolist() == right["id"].tolist()
@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import columnar_source as cs
+import query_engine
+
+_versions = itertools.count()
+
+
+def _kpi(rows=400):
+    rng = np.random.default_rng(21)
+    return pd.DataFrame({
+        "date": pd.date_range("2025-01-01", periods=rows, freq="D"),
+        "latency_ms": rng.gamma(9.0, 55.0, rows),
+        "uptime": 100 - rng.exponential(0.15, rows),
+    })
+
+
+# Отдельная версия на тест — свой движок, без кэша запросов от соседних тестов
+@pytest.fixture
+def version(monkeypatch):
+    monkeypatch.setattr(cs, "DATA_DIR", None)
+    monkeypatch.setitem(cs.FALLBACKS, "kpi_daily", _kpi)
+    return f"test-{next(_versions)}"
+
+
+def test_monthly_aggregate_matches_pandas(version):
+    result = query_engine.aggregate(
+        "kpi_daily", {"latency": ("avg", "latency_ms"), "Дней": ("count", "latency_ms")},
+        grain=("date", "month"), version=version,
+    ).to_pandas()
+    expected = _kpi().set_index("date").resample("MS")["latency_ms"].agg(["mean", "count"])
+    np.testing.assert_allclose(result["latency"], expected["mean"])
+    assert result["Дней"].tolist() == expected["count"].tolist()
+    assert pd.to_datetime(result["period"]).tolist() == expected.index.tolist()
+
+
+def test_filters(version):
+    start = pd.Timestamp("2025-06-01")
+    result = query_engine.select(
+        "kpi_daily", ["date", "uptime"],
+        filters=[("date", ">=", start), ("uptime", "<", 99.9), ("latency_ms", ">", None)],
+        order_by=[("uptime", True)], limit=10, version=version,
+    ).to_pandas()
+    df = _kpi()
+    expected = df[(df["date"] >= start) & (df["uptime"] < 99.9)].nsmallest(10, "uptime")
+    np.testing.assert_allclose(result["uptime"], expected["uptime"])
+
+
+def test_rejects_unknown_names(version):
+    with pytest.raises(KeyError):
+        query_engine.build_aggregate("kpi_daily", {"x": ("avg", 'uptime") FROM kpi_daily; --')}, version=version)
+    with pytest.raises(KeyError):
+        query_engine.build_aggregate("нет такого", {"x": ("avg", "uptime")}, version=version)
+    with pytest.raises(ValueError):
+        query_engine.build_aggregate("kpi_daily", {"x": ("stddev", "uptime")}, version=version)
+    with pytest.raises(ValueError):
+        query_engine.build_aggregate("kpi_daily", {"x": ("avg", "uptime")}, filters=[("uptime", "like", "9%")],
+                                     version=version)
+
+
+# Тот же срез по Parquet-хранилищу с hive-партициями совпадает с расчётом по mock-кадру
+def test_parquet_store_matches_fallback(version, tmp_path, monkeypatch):
+    df = _kpi()
+    pq.write_to_dataset(pa.Table.from_pandas(df.assign(month=df["date"].dt.month), preserve_index=False),
+                        tmp_path / "kpi_daily", partition_cols=["month"])
+    measures = {"p95": ("p95", "uptime"), "max": ("max", "latency_ms")}
+    expected = query_engine.aggregate("kpi_daily", measures, grain=("date", "quarter"), version=version)
+    monkeypatch.setattr(cs, "DATA_DIR", str(tmp_path))
+    result = query_engine.aggregate("kpi_daily", measures, grain=("date", "quarter"), version=version + "-store")
+    assert result.select(["p95", "max"]).equals(expected.select(["p95", "max"]))
+
+
+def test_engines_evicted_lru(version, monkeypatch):
+    monkeypatch.setattr(query_engine, "ENGINES", 2)
+    first = query_engine.engine(version + "-a")
+    query_engine.engine(version + "-b")
+    assert query_engine.engine(version + "-a") is first
+    query_engine.engine(version + "-c")
+    # Вытеснена давно не запрошенная версия b, недавняя a осталась
+    keys = [key[1] for key in query_engine._engines]
+    assert keys == [version + "-a", version + "-c"]
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+import charts
+import data_layer as dl
+import report_export
+
+FIRST, SECOND = "Запуск чат-бота", "Модель оценки риска"
+
+
+# Срез второго проекта; в мок-данных VOC и достоверность есть только у первого —
+# берутся его ряды со сдвигом дат и значений
+def _slices():
+    version = dl.get_source_version()
+    first = dl.load_project_slice(FIRST, version)
+    second = list(dl.load_project_slice(SECOND, version))
+    voc = first[1].assign(**{"Проект": SECOND, "VOC, %": first[1]["VOC, %"] - 3})
+    second[1] = voc.assign(Дата=voc["Дата"] + pd.DateOffset(months=1))
+    accuracy = first[2].assign(**{"Проект": SECOND, "Достоверность, %": first[2]["Достоверность, %"][::-1].to_numpy()})
+    second[2] = accuracy.assign(Дата=accuracy["Дата"] + pd.Timedelta(days=7))
+    return first, second
+
+
+def _values(spec):
+    if "datasets" in spec:
+        return spec["datasets"][spec["data"]["name"]]
+    return spec["data"]["values"]
+
+
+# Шаблон, построенный по первому проекту, с данными второго совпадает со спецификацией,
+# которую Altair строит по второму проекту сам
+@pytest.mark.parametrize("name", list(report_export.PROJECT_SOURCES))
+def test_template_matches_own_spec(name):
+    first, second = _slices()
+    templates = {key: chart.to_dict() for key, chart in charts.project_charts(*first).items()}
+    own = charts.project_charts(*second)[name].to_dict()
+    source = second[report_export.PROJECT_SOURCES[name]]
+    reused = report_export._with_data(templates[name], source)
+
+    def without_data(spec):
+        return {key: value for key, value in spec.items() if key not in ("data", "datasets")}
+
+    assert without_data(reused) == without_data(own)
+    left, right = pd.DataFrame(_values(reused)), pd.DataFrame(_values(own))
+    for column in source.select_dtypes("datetime").columns:
+        left[column], right[column] = pd.to_datetime(left[column]), pd.to_datetime(right[column])
+    pd.testing.assert_frame_equal(left, right)
+    assert (right["Проект"] == SECOND).all()
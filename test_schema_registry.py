@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import schema_registry
+
+
+def _timeline(rows=1000):
+    return pd.DataFrame({
+        "Проект": [f"Проект {i % 20}" for i in range(rows)],
+        "Начало": pd.date_range("2025-01-01", periods=rows, freq="h").astype(str),
+        "Окончание": pd.date_range("2025-02-01", periods=rows, freq="h"),
+        "Команда": [["NLP", "MLOps"][i % 2] for i in range(rows)],
+    })
+
+
+def test_enforce_applies_registry_types():
+    df = schema_registry.enforce(_timeline(), "project_timeline")
+    assert isinstance(df["Проект"].dtype, pd.CategoricalDtype)
+    assert df["Начало"].dtype == schema_registry.DATE
+    assert df["Окончание"].dtype == schema_registry.DATE
+    stats = schema_registry.memory()["project_timeline"]
+    assert stats["rows"] == 1000 and stats["after"] < stats["before"]
+
+
+# Почти уникальные строки в category не переводятся; пропуски в целых — nullable-тип
+def test_enforce_keeps_unique_strings_and_missing_ints():
+    df = pd.DataFrame({
+        "Сотрудник": [f"Сотрудник {i}" for i in range(10)],
+        "Команда": ["NLP"] * 10,
+        "План задач": [1.0, np.nan] + [3.0] * 8,
+    })
+    df = schema_registry.enforce(df, "employees")
+    assert not isinstance(df["Сотрудник"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["Команда"].dtype, pd.CategoricalDtype)
+    assert df["План задач"].dtype == "Int16" and df["План задач"].isna().sum() == 1
+
+
+# Видимые пользователю значения не теряют точность float32
+def test_display_columns_stay_float64():
+    df = schema_registry.enforce(pd.DataFrame({"Команда": ["A", "A"], "План": [99.9, 0.97], "Факт": [99.5, 0.95]}),
+                                 "kpi_teams")
+    assert df["План"].tolist() == [99.9, 0.97]
+
+
+def test_to_pandas_dictionary_encodes_categories():
+    table = pa.Table.from_pandas(_timeline(), preserve_index=False)
+    df = schema_registry.to_pandas(table, "project_timeline")
+    assert isinstance(df["Проект"].dtype, pd.CategoricalDtype)
+    assert df["Проект"].tolist() == _timeline()["Проект"].tolist()
+    assert "project_timeline" in schema_registry.report()["Датасет"].tolist()
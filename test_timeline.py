@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import timeline
+
+TODAY = pd.Timestamp("2025-06-15")
+
+
+def _projects(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 900, n), unit="D")
+    return pd.DataFrame({
+        "Проект": [f"Проект {i}" for i in range(n)],
+        "Начало": starts,
+        # Длинные проекты вперемешку с однодневными — префиксный максимум не монотонен по концам
+        "Окончание": starts + pd.to_timedelta(np.where(rng.random(n) < 0.1, rng.integers(300, 700, n),
+                                                       rng.integers(0, 60, n)), unit="D"),
+        "Команда": rng.choice(["NLP", "MLOps", "DevOps", "PM"], n),
+    })
+
+
+# Эталон: проект виден, если пересекает окно включительно
+def _overlapping(df, date_from, date_to):
+    return set(df.loc[(df["Начало"] <= date_to) & (df["Окончание"] >= date_from), "Проект"])
+
+
+@pytest.mark.parametrize("window", [
+    ("2025-01-01", "2025-03-31"),
+    ("2024-01-01", "2024-01-01"),
+    ("2026-06-01", "2027-01-01"),
+    ("2020-01-01", "2021-01-01"),
+])
+def test_window_matches_brute_force(window):
+    df = _projects()
+    index = timeline.TimelineIndex(df, today=TODAY)
+    date_from, date_to = map(pd.Timestamp, window)
+    visible = index.query(date_from, date_to)
+    assert set(visible["Проект"]) == _overlapping(df, date_from, date_to)
+    assert visible["Начало"].is_monotonic_increasing
+
+
+def test_query_filters():
+    df = _projects()
+    index = timeline.TimelineIndex(df, today=TODAY)
+    visible = index.query("2025-01-01", "2025-12-31", teams=["NLP"], statuses=["В работе"])
+    expected = df[(df["Команда"] == "NLP") & (df["Начало"] <= TODAY) & (df["Окончание"] >= TODAY)]
+    assert set(visible["Проект"]) == _overlapping(expected, pd.Timestamp("2025-01-01"), pd.Timestamp("2025-12-31"))
+
+
+def test_status_boundaries():
+    df = pd.DataFrame({
+        "Проект": ["закончился вчера", "заканчивается сегодня", "начинается сегодня", "начнётся завтра"],
+        "Начало": pd.to_datetime(["2025-06-01", "2025-06-01", "2025-06-15", "2025-06-16"]),
+        "Окончание": pd.to_datetime(["2025-06-14", "2025-06-15", "2025-06-30", "2025-06-30"]),
+    })
+    status = timeline.with_status(df, TODAY)["Статус"].tolist()
+    assert status == ["Завершён", "В работе", "В работе", "Запланирован"]
+
+
+def test_empty_index():
+    index = timeline.TimelineIndex(_projects().iloc[:0], today=TODAY)
+    assert index.bounds() == (None, None)
+    assert index.query("2025-01-01", "2025-12-31").empty
+
+
+def test_swimlanes_count_active_projects():
+    df = timeline.with_status(_projects(), TODAY)
+    lanes = timeline.swimlanes(df, "2025-01-01", "2025-06-30")
+    for row in lanes.sample(30, random_state=0).itertuples(index=False):
+        group = df[df["Статус"] == row.Статус]
+        assert row.Проектов == ((group["Начало"] <= row.Неделя) & (group["Окончание"] >= row.Неделя)).sum()
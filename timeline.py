@@ -0,0 +1,97 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Движок план-графика для большого портфеля проектов
+# -------------------------------
+# Проекты сортируются по дате начала, рядом хранится префиксный максимум дат
+# окончания. Запрос окна [from, to] — два бинарных поиска и маска только по
+# кандидатам, так что в спецификацию попадают лишь видимые полосы.
+# Когда видимых проектов больше MAX_BARS, вместо полосы на проект рисуются
+# дорожки (swimlanes): число активных проектов по неделям в каждой группе.
+
+MAX_BARS = 200
+BAR_HEIGHT_PX = 20
+STATUSES = ["Запланирован", "В работе", "Завершён"]
+
+
+def with_status(df, today=None):
+    today = pd.Timestamp(today or pd.Timestamp.today().normalize())
+    starts = pd.to_datetime(df["Начало"])
+    ends = pd.to_datetime(df["Окончание"])
+    status = np.select([ends < today, starts > today], ["Завершён", "Запланирован"], default="В работе")
+    return df.assign(**{"Статус": pd.Categorical(status, categories=STATUSES)})
+
+
+class TimelineIndex:
+    def __init__(self, df, today=None):
+        df = df if "Статус" in df.columns else with_status(df, today)
+        df = df.assign(**{
+            "Начало": pd.to_datetime(df["Начало"]),
+            "Окончание": pd.to_datetime(df["Окончание"]),
+        })
+        self.frame = df.sort_values("Начало", kind="stable").reset_index(drop=True)
+        self.starts = self.frame["Начало"].to_numpy(dtype="datetime64[ns]")
+        self.ends = self.frame["Окончание"].to_numpy(dtype="datetime64[ns]")
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def bounds(self):
+        if self.frame.empty:
+            return None, None
+        return pd.Timestamp(self.starts[0]), pd.Timestamp(self.max_ends[-1])
+
+    # Позиции проектов, пересекающих окно: start <= to и end >= from
+    def window_positions(self, date_from, date_to):
+        date_from = np.datetime64(pd.Timestamp(date_from), "ns")
+        date_to = np.datetime64(pd.Timestamp(date_to), "ns")
+        hi = np.searchsorted(self.starts, date_to, side="right")
+        lo = np.searchsorted(self.max_ends[:hi], date_from, side="left")
+        candidates = np.arange(lo, hi)
+        return candidates[self.ends[lo:hi] >= date_from]
+
+    def query(self, date_from, date_to, teams=None, statuses=None):
+        visible = self.frame.iloc[self.window_positions(date_from, date_to)]
+        if teams and "Команда" in visible.columns:
+            visible = visible[visible["Команда"].isin(teams)]
+        if statuses:
+            visible = visible[visible["Статус"].isin(statuses)]
+        return visible
+
+
+# Число активных проектов по неделям для каждой дорожки
+def swimlanes(visible, date_from, date_to, lane="Статус", freq="W-MON"):
+    weeks = pd.date_range(pd.Timestamp(date_from).normalize(), pd.Timestamp(date_to), freq=freq)
+    if visible.empty or len(weeks) == 0:
+        return pd.DataFrame(columns=[lane, "Неделя", "Проектов"])
+    week_ns = weeks.to_numpy(dtype="datetime64[ns]")
+    rows = []
+    for name, group in visible.groupby(lane, observed=True):
+        starts = np.sort(group["Начало"].to_numpy(dtype="datetime64[ns]"))
+        ends = np.sort(group["Окончание"].to_numpy(dtype="datetime64[ns]"))
+        # активные на начало недели: начались не позже и закончились не раньше
+        active = np.searchsorted(starts, week_ns, side="right") - np.searchsorted(ends, week_ns, side="left")
+        rows.append(pd.DataFrame({lane: name, "Неделя": weeks, "Проектов": active}))
+    return pd.concat(rows, ignore_index=True)
+
+
+def timeline_chart(visible, date_from, date_to, max_bars=MAX_BARS, lane="Статус", color="#007BFF"):
+    if len(visible) <= max_bars:
+        return alt.Chart(visible[["Проект", "Начало", "Окончание", "Статус"]]).mark_bar().encode(
+            x=alt.X('Начало:T', scale=alt.Scale(domain=[pd.Timestamp(date_from).isoformat(), pd.Timestamp(date_to).isoformat()])),
+            x2='Окончание:T',
+            y=alt.Y('Проект:N', sort=None),
+            color=alt.value(color),
+            tooltip=["Проект", "Начало", "Окончание", "Статус"]
+        ).properties(height=max(len(visible) * BAR_HEIGHT_PX, 100))
+    # Высокая плотность: агрегированные дорожки, отрисовка на canvas вместо SVG
+    lanes = swimlanes(visible, date_from, date_to, lane)
+    return alt.Chart(lanes).mark_rect().encode(
+        x=alt.X("Неделя:T"),
+        y=alt.Y(f"{lane}:N", title=lane),
+        color=alt.Color("Проектов:Q", scale=alt.Scale(scheme="blues")),
+        tooltip=[lane, "Неделя", "Проектов"]
+    ).properties(
+        height=max(lanes[lane].nunique() * 40, 100),
+        usermeta={"embedOptions": {"renderer": "canvas"}}
+    )